@@ -0,0 +1,57 @@
+# Full-table download time: the REST to_dataframe() path the app used to take
+# against the Arrow path (Storage Read API when available), each followed by
+# dtypes.compact(). Needs a service account key, or --fake to run the same
+# code against a local snapshot.
+#
+#   python benchmarks/bigquery_download.py --credentials key.json [--repeat 3]
+#   python benchmarks/bigquery_download.py --fake data/dataset.arrow
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from telehealth import download, dtypes
+from telehealth.data import TABLE
+
+QUERY = f"SELECT * FROM `{TABLE}`"
+
+
+def rest(client):
+    return dtypes.compact(client.query(QUERY).result().to_dataframe(create_bqstorage_client=False))
+
+
+def arrow(client):
+    return dtypes.compact(download.query_to_dataframe(client, QUERY))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--credentials", help="Service account JSON key")
+    source.add_argument("--fake", metavar="SNAPSHOT", help="Serve queries from a local snapshot instead")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fake:
+        from telehealth.fake_bigquery import FakeClient
+        client = FakeClient.from_snapshot(args.fake, table=TABLE)
+    else:
+        from google.cloud import bigquery
+        client = bigquery.Client.from_service_account_json(args.credentials)
+
+    for name, load in [("rest", rest), ("arrow", arrow)]:
+        seconds = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            data = load(client)
+            seconds.append(time.perf_counter() - start)
+        print(f"{name:6} {statistics.median(seconds):8.3f}s  {len(data)} rows  "
+              f"{data.memory_usage(deep=True).sum() / 2**20:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
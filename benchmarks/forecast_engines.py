@@ -0,0 +1,68 @@
+# Fit latency and holdout accuracy of each forecasting engine. The last
+# --holdout periods of every Indicator/Group/Subgroup series are held back,
+# each engine forecasts them from the rest, and the errors and 80% interval
+# coverage are compared.
+#
+#   python benchmarks/forecast_engines.py [snapshot.arrow] [--limit 100] [--holdout 2]
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from telehealth import batch_forecast, config, dtypes, snapshot  # noqa: E402
+from telehealth.engines import ENGINES  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default=config.snapshot_path())
+    parser.add_argument("--limit", type=int, help="Only use the first N series (Prophet is slow)")
+    parser.add_argument("--holdout", type=int, default=2, help="Periods held back per series")
+    args = parser.parse_args()
+
+    logging.getLogger("cmdstanpy").disabled = True
+    data = dtypes.compact(snapshot.read_snapshot(args.path))
+    train, test = [], []
+    for _, series in batch_forecast.forecast_series(data):
+        series = series.dropna()
+        if len(series) >= args.holdout + 3:
+            train.append(series.iloc[:-args.holdout].reset_index(drop=True))
+            test.append(series.iloc[-args.holdout:].reset_index(drop=True))
+    if args.limit:
+        train, test = train[:args.limit], test[:args.limit]
+    futures = [pd.DatetimeIndex(series["ds"]) for series in test]
+    actual = np.concatenate([series["y"].to_numpy() for series in test])
+
+    rows = []
+    for name, engine in ENGINES.items():
+        start = time.perf_counter()
+        entries = engine.forecast_many(train, futures)
+        elapsed = time.perf_counter() - start
+
+        predicted = pd.concat([entry["forecast"].tail(args.holdout) for entry in entries], ignore_index=True)
+        error = predicted["yhat"].to_numpy() - actual
+        covered = (predicted["yhat_lower"].to_numpy() <= actual) & (actual <= predicted["yhat_upper"].to_numpy())
+        rows.append({
+            "engine": name,
+            "series": len(train),
+            "fit_seconds": elapsed,
+            "ms_per_series": 1000 * elapsed / len(train),
+            "MAE": np.abs(error).mean(),
+            "RMSE": np.sqrt((error ** 2).mean()),
+            "coverage_80": covered.mean(),
+        })
+
+    report = pd.DataFrame(rows).set_index("engine")
+    with pd.option_context("display.float_format", "{:.3f}".format):
+        print(report)
+    print(f"\nfast is {report.loc['prophet', 'fit_seconds'] / report.loc['fast', 'fit_seconds']:.0f}x faster to fit")
+
+
+if __name__ == "__main__":
+    main()
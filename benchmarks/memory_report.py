@@ -0,0 +1,43 @@
+# Before/after memory use of the dataset frame with the compact dtypes from
+# telehealth.dtypes. The app holds one frame per process in st.cache_resource,
+# shared read-only by every session, so the saving applies once per process.
+#
+#   python benchmarks/memory_report.py [snapshot.arrow|snapshot.parquet]
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from telehealth import config, dtypes, snapshot  # noqa: E402
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else config.snapshot_path()
+    # Undo any compaction stored in the snapshot, so "before" has the types
+    # BigQuery's to_dataframe gives us: strings and dates as Python objects,
+    # float64 and int64
+    before = snapshot.read_snapshot(path)
+    for column in dtypes.CATEGORY_COLUMNS + dtypes.DATE_COLUMNS:
+        if column in before and before[column].dtype != object:
+            before[column] = before[column].astype(object)
+    for column in dtypes.FLOAT_COLUMNS:
+        if column in before:
+            before[column] = before[column].astype("float64")
+    if "Time_Period" in before and pd.api.types.is_integer_dtype(before["Time_Period"]):
+        before["Time_Period"] = before["Time_Period"].astype("int64")
+    after = dtypes.compact(before)
+
+    report = dtypes.memory_report(before, after)
+    with pd.option_context("display.float_format", "{:.2f}".format, "display.width", 120):
+        print(f"{len(before)} rows from {path}\n")
+        print(report)
+
+    before_mb, after_mb = report.loc["Total", ["before_MB", "after_MB"]]
+    print(f"\nPer process: {before_mb:.2f} MB -> {after_mb:.2f} MB "
+          f"({before_mb - after_mb:.2f} MB saved, {after_mb / before_mb:.0%} of the original)")
+
+
+if __name__ == "__main__":
+    main()
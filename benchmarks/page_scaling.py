@@ -0,0 +1,130 @@
+# How every page's data prep and figure building scale with the size of the
+# table, on synthetic snapshots from telehealth.synthetic at 1x, 10x and 100x
+# the real table (no BigQuery needed). Each page runs headlessly in a fresh
+# process with empty caches, once for wall time and once under tracemalloc
+# for peak memory, and reports the bytes of figure JSON sent to the browser.
+# Fragment times break each page down by plot function.
+#
+#   python benchmarks/page_scaling.py [--scales 1 10 100] [--save results.json]
+#                                     [--baseline results.json --tolerance 1.5] [pages ...]
+#
+# With --baseline, any page slower, hungrier or heavier than the baseline by
+# more than the tolerance factor is listed and the exit status is 1.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from telehealth import headless, snapshot, synthetic  # noqa: E402
+
+# Runs in the child process. Libraries every page uses are imported up front
+# so the numbers are the page's own work; fragments are tracked to time each
+# plot function.
+RUNNER = """
+import json, os, sys, time, tracemalloc
+sys.path.insert(0, os.getcwd())
+import plotly.express, plotly.graph_objects
+import telehealth.data, telehealth.figures, telehealth.forecast
+from streamlit.testing.v1 import AppTest
+from telehealth import headless
+
+page, mode = sys.argv[1], sys.argv[2]
+fragments = {}
+
+def record(name, seconds, widgets):
+    fragments[name] = fragments.get(name, 0) + seconds
+
+headless.track_fragments(record)
+if mode == "memory":
+    tracemalloc.start()
+start = time.perf_counter()
+at = AppTest.from_file(os.path.abspath(page), default_timeout=3600).run()
+result = {"seconds": time.perf_counter() - start, "error": bool(at.exception)}
+if mode == "memory":
+    result = {"peak_MB": tracemalloc.get_traced_memory()[1] / 2**20}
+else:
+    charts = at.get("plotly_chart")
+    result.update(charts=len(charts), payload_KB=sum(len(chart.proto.spec) for chart in charts) / 2**10,
+                  fragments=fragments)
+print(json.dumps(result))
+"""
+
+METRICS = ["seconds", "peak_MB", "payload_KB"]
+
+
+def run_child(page, mode, path, workdir):
+    env = dict(os.environ, TELEHEALTH_DATA_SOURCE="snapshot", TELEHEALTH_SNAPSHOT_PATH=path,
+               TELEHEALTH_FORECAST_CACHE_DIR=tempfile.mkdtemp(dir=workdir),
+               TELEHEALTH_FORECAST_TABLE_PATH=os.path.join(workdir, "no-forecasts.arrow"))
+    result = subprocess.run([sys.executable, "-c", RUNNER, page, mode], cwd=ROOT, env=env,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"{page} ({mode}) failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(scales, page_list, workdir):
+    rows, fragments = [], []
+    for scale in scales:
+        path = os.path.join(workdir, f"synthetic-{scale:g}x.arrow")
+        data = synthetic.generate(scale)
+        snapshot.write_snapshot(data, path)
+        for page in page_list:
+            timing = run_child(page, "time", path, workdir)
+            memory = run_child(page, "memory", path, workdir)
+            rows.append({"scale": scale, "rows": len(data), "page": page, "seconds": timing["seconds"],
+                         "peak_MB": memory["peak_MB"], "payload_KB": timing["payload_KB"],
+                         "charts": timing["charts"], "error": timing["error"]})
+            fragments += [{"scale": scale, "page": page, "function": name, "seconds": seconds}
+                          for name, seconds in timing["fragments"].items()]
+    return pd.DataFrame(rows), pd.DataFrame(fragments)
+
+
+# Rows of `results` that are worse than the same page and scale in `baseline`
+# by more than `tolerance` times, on any metric
+def regressions(results, baseline, tolerance):
+    merged = results.merge(baseline, on=["scale", "page"], suffixes=("", "_baseline"))
+    worse = pd.concat([merged[metric] > merged[f"{metric}_baseline"] * tolerance for metric in METRICS], axis=1)
+    return merged.loc[worse.any(axis=1), ["scale", "page"] + [column for metric in METRICS
+                                                               for column in (metric, f"{metric}_baseline")]]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed slowdown factor against the baseline")
+    parser.add_argument("pages", nargs="*")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results, fragments = measure(args.scales, args.pages or headless.pages(), workdir)
+
+    with pd.option_context("display.float_format", "{:.2f}".format, "display.width", 160,
+                           "display.max_colwidth", 60, "display.max_rows", None,
+                           "display.max_columns", None):
+        print(results.set_index(["page", "scale"]).sort_index())
+        print()
+        print(fragments.pivot_table(index=["page", "function"], columns="scale", values="seconds"))
+
+    if args.save:
+        results.to_json(args.save, orient="records", indent=1)
+    if args.baseline:
+        worse = regressions(results, pd.read_json(args.baseline, orient="records"), args.tolerance)
+        if not worse.empty:
+            print(f"\nRegressions beyond {args.tolerance}x the baseline:")
+            print(worse.to_string(index=False))
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance}x the baseline")
+
+
+if __name__ == "__main__":
+    main()
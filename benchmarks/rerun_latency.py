@@ -0,0 +1,92 @@
+# Rerun latency of every widget interaction, reading the local snapshot.
+# Without fragments each interaction reruns the whole page script; with them
+# only the fragment that owns the widget reruns. For each widget this reports
+# both: the full script rerun, and the time spent in the owning fragment.
+#
+#   python benchmarks/rerun_latency.py [--snapshot data/dataset.arrow] [--repeat 5] [pages ...]
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from telehealth import headless  # noqa: E402
+
+WIDGETS = ["selectbox", "radio", "select_slider", "multiselect", "number_input"]
+
+# Seconds spent in each fragment during the latest run, and the widget ids
+# each fragment created
+fragment_seconds = {}
+fragment_widgets = {}
+
+
+def record(name, seconds, widgets):
+    fragment_seconds[name] = seconds
+    fragment_widgets[name] = widgets
+
+
+headless.track_fragments(record)
+
+
+# Two values to flip between, so every timed run is a real change
+def alternatives(kind, widget):
+    if kind == "multiselect":
+        return [list(widget.options[:1]), list(widget.value)]
+    if kind == "number_input":
+        proto = widget.proto
+        return [widget.value + 1, widget.value] if not proto.has_max or widget.value < proto.max else None
+    options = list(widget.options)
+    return [options[-1], options[0]] if len(options) > 1 else None
+
+
+def measure_page(page, repeat):
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600).run()
+    rows = []
+    for kind in WIDGETS:
+        for position in range(len(at.get(kind))):
+            values = alternatives(kind, at.get(kind)[position])
+            if values is None:
+                continue
+            full, partial = [], []
+            for run in range(repeat):
+                widget = at.get(kind)[position]
+                widget.set_value(values[run % 2])
+                start = time.perf_counter()
+                at.run()
+                full.append(time.perf_counter() - start)
+                owner = next((name for name, ids in fragment_widgets.items() if widget.id in ids), None)
+                partial.append(fragment_seconds[owner] if owner else full[-1])
+            rows.append({
+                "page": page,
+                "widget": f"{kind}: {widget.label}",
+                "fragment": owner or "(page)",
+                "full_rerun_ms": statistics.median(full) * 1000,
+                "fragment_rerun_ms": statistics.median(partial) * 1000,
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pages", nargs="*")
+    parser.add_argument("--snapshot", default=os.path.join(ROOT, "data", "dataset.arrow"))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.update(TELEHEALTH_DATA_SOURCE="snapshot", TELEHEALTH_SNAPSHOT_PATH=args.snapshot,
+                      TELEHEALTH_FORECAST_CACHE_DIR=tempfile.mkdtemp())
+    report = pd.DataFrame([row for page in args.pages or headless.pages() for row in measure_page(page, args.repeat)])
+    report["speedup"] = report["full_rerun_ms"] / report["fragment_rerun_ms"]
+    print(report.to_string(index=False, float_format="%.1f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Memory held per visitor: N sessions each open every page in one process,
+# on a synthetic snapshot (telehealth.synthetic) so the table is big enough
+# for copies to show. Python allocations are traced after each session; the
+# first session includes the shared dataset, index and caches, every later
+# one only what that session keeps for itself. Pass --compare REV to measure
+# another git revision side by side, e.g. the commit before a change:
+#
+#   python benchmarks/session_memory.py [--sessions 4] [--scale 10] [--compare HEAD~1]
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from telehealth import headless, snapshot, synthetic  # noqa: E402
+
+# Runs in the child process: every page for each session in turn, with all
+# sessions kept alive, reporting traced memory after each one. The page list
+# comes from this process, since an older revision may predate the helper.
+RUNNER = """
+import gc, json, os, sys, tracemalloc
+sys.path.insert(0, os.getcwd())
+from streamlit.testing.v1 import AppTest
+pages = json.loads(sys.argv[2])
+tracemalloc.start()
+sessions, traced = [], []
+for _ in range(int(sys.argv[1])):
+    sessions.append([AppTest.from_file(os.path.abspath(page), default_timeout=600).run() for page in pages])
+    gc.collect()
+    traced.append(tracemalloc.get_traced_memory()[0])
+print(json.dumps({"traced": traced, "error": any(at.exception for apps in sessions for at in apps)}))
+"""
+
+
+def measure(tree, path, sessions):
+    env = dict(os.environ, TELEHEALTH_DATA_SOURCE="snapshot", TELEHEALTH_SNAPSHOT_PATH=path,
+               TELEHEALTH_FORECAST_CACHE_DIR=tempfile.mkdtemp(), TELEHEALTH_FORECAST_ENGINE="fast")
+    result = subprocess.run([sys.executable, "-c", RUNNER, str(sessions), json.dumps(headless.pages(tree))],
+                            cwd=tree, env=env, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr)
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    traced = pd.Series(run["traced"]) / 2**20
+    return {
+        "first_session_MB": traced.iloc[0],
+        "per_extra_session_MB": traced.diff().iloc[1:].mean(),
+        "total_MB": traced.iloc[-1],
+        "error": run["error"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--scale", type=float, default=10, help="Synthetic table size relative to the real one")
+    parser.add_argument("--compare", metavar="REV", help="Also measure this git revision")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, "dataset.arrow")
+        data = synthetic.generate(args.scale)
+        snapshot.write_snapshot(data, path)
+
+        report = {"now": measure(ROOT, path, args.sessions)}
+        if args.compare:
+            worktree = os.path.join(workdir, "compare")
+            subprocess.run(["git", "worktree", "add", "--detach", worktree, args.compare], cwd=ROOT,
+                           check=True, capture_output=True)
+            try:
+                report[args.compare] = measure(worktree, path, args.sessions)
+            finally:
+                subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, capture_output=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with pd.option_context("display.float_format", "{:.2f}".format, "display.width", 160):
+        print(f"{len(data)} rows, {args.sessions} sessions of {len(headless.pages())} pages\n")
+        print(pd.DataFrame(report).T)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Time to first render of every page in a fresh Python process, reading the
+# local snapshot so BigQuery latency doesn't drown out import and render time.
+# Pass --compare REV to measure another git revision side by side, e.g. the
+# commit before a change:
+#
+#   python benchmarks/startup.py --compare HEAD~1 [--repeat 3] [--snapshot data/dataset.arrow]
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from telehealth import headless  # noqa: E402
+
+# Runs in the child process: imports, data load and the first full script run
+# of one page, with an empty cache as on a cold start
+RUNNER = """
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, os.getcwd())
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(os.path.abspath(sys.argv[1]), default_timeout=600).run()
+print(json.dumps({"seconds": time.perf_counter() - start, "error": bool(at.exception),
+                  "modules": len(sys.modules)}))
+"""
+
+
+def measure(tree, page, snapshot, repeat):
+    env = dict(os.environ, TELEHEALTH_DATA_SOURCE="snapshot", TELEHEALTH_SNAPSHOT_PATH=snapshot,
+               TELEHEALTH_FORECAST_CACHE_DIR=tempfile.mkdtemp())
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", RUNNER, page], cwd=tree, env=env,
+                                capture_output=True, text=True)
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": statistics.median(run["seconds"] for run in runs),
+        "modules": runs[-1]["modules"],
+        "error": any(run["error"] for run in runs),
+    }
+
+
+def measure_tree(tree, snapshot, repeat):
+    return pd.DataFrame({page: measure(tree, page, snapshot, repeat) for page in headless.pages(tree)}).T
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--snapshot", default=os.path.join(ROOT, "data", "dataset.arrow"))
+    parser.add_argument("--compare", metavar="REV", help="Also measure this git revision")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    snapshot = os.path.abspath(args.snapshot)
+
+    report = measure_tree(ROOT, snapshot, args.repeat).add_prefix("now_")
+    if args.compare:
+        worktree = tempfile.mkdtemp()
+        subprocess.run(["git", "worktree", "add", "--detach", worktree, args.compare], cwd=ROOT,
+                       check=True, capture_output=True)
+        try:
+            before = measure_tree(worktree, snapshot, args.repeat).add_prefix(f"{args.compare}_")
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", worktree], cwd=ROOT, capture_output=True)
+            shutil.rmtree(worktree, ignore_errors=True)
+        report = before.join(report, how="outer")
+        report["speedup"] = report[f"{args.compare}_seconds"] / report["now_seconds"]
+
+    with pd.option_context("display.float_format", "{:.2f}".format, "display.width", 160, "display.max_columns", None):
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
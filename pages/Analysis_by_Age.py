@@ -1,39 +1,22 @@
 import streamlit as st
-from google.oauth2 import service_account
-from google.cloud import bigquery
+from telehealth.data import load_cube, load_slices
+from telehealth.panels import profiling_panel
+from telehealth.profiling import profiled
 import plotly.graph_objects as go
 import plotly.express as px
 
-@st.cache_data
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-
-    client = bigquery.Client(credentials=credentials)
-
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT Indicator, `Group`, Subgroup, Time_Period_Label, Value
-    FROM `4weekdataset.dataset`
-    """
-    
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
-
+@st.fragment
+@profiled
 def plot_value_by_time_period(data):
-    # Filter data for age groups
-    df = data[data['Group'].isin(['By Age'])]
-    unique_indicators = df['Time_Period_Label'].unique()
+    # Time periods within the age groups
+    unique_indicators = data.unique('Time_Period_Label', Group='By Age')
     st.title("Nightingale Rose Chart")
 
     # User selects indicator
     selected_time_period = st.selectbox("Select Time Period", unique_indicators)
 
-    # Filter data based on user-selected time period
-    selected_data = df[df['Time_Period_Label'] == selected_time_period]
-    df = selected_data.pivot(index='Indicator', columns='Subgroup', values='Value')
+    # Indicator x age group table for the user-selected time period
+    df = load_cube('By Age').table('Indicator', 'Subgroup', Time_Period_Label=selected_time_period)
     st.write(df)
 
     fig = go.Figure()
@@ -76,17 +59,17 @@ def plot_value_by_time_period(data):
     st.write(fig)
 
 
+@st.fragment
+@profiled
 def plot_value_by_indicator(data):
-    # Filter data for age groups
-    df = data[data['Group'].isin(['By Age'])]
-    unique_indicators = df['Indicator'].unique()
+    # Indicators within the age groups
+    unique_indicators = data.unique('Indicator', Group='By Age')
     st.title("Heat Matrix")
     # User selects indicator
     selected_time_period = st.selectbox("Select Indicator", unique_indicators)
 
-    # Filter data based on user-selected indicator
-    selected_data = df[df['Indicator'] == selected_time_period]
-    df = selected_data.pivot(index='Subgroup', columns='Time_Period_Label', values='Value')
+    # Age group x time period table for the user-selected indicator
+    df = load_cube('By Age').table('Subgroup', 'Time_Period_Label', Indicator=selected_time_period)
     df = df.reset_index()
     st.write(df)
 
@@ -99,19 +82,17 @@ def plot_value_by_indicator(data):
     # Display the figure
     st.plotly_chart(fig)
 
+@st.fragment
+@profiled
 def plot_value_by_age_group(data):
-    df = data[data['Group'].isin(['By Age'])]
-    unique_indicators = df['Subgroup'].unique()
+    unique_indicators = data.unique('Subgroup', Group='By Age')
     st.title("Stream Graph")
 
     # User selects indicator
     selected_time_period = st.selectbox("Select Subgroup", unique_indicators)
 
-    # Filter data based on user-selected indicator
-    selected_data = df[df['Subgroup'] == selected_time_period]
-    df = selected_data.pivot(index='Indicator', columns='Time_Period_Label', values='Value')
-    df = df.reset_index()
-    df.set_index("Indicator", inplace=True)
+    # Indicator x time period table for the user-selected age group
+    df = load_cube('By Age').table('Indicator', 'Time_Period_Label', Subgroup=selected_time_period)
     st.write(df)
 
     df_tidy = df.T.reset_index()
@@ -140,8 +121,10 @@ def plot_value_by_age_group(data):
 st.title("Age Analysis")
 
 # Load data from BigQuery
-data = load_data_from_bigquery()
+data = load_slices(['Indicator', 'Group', 'Subgroup', 'Time_Period_Label', 'Value'])
 
 plot_value_by_time_period(data)
 plot_value_by_indicator(data)
-plot_value_by_age_group(data)
\ No newline at end of file
+plot_value_by_age_group(data)
+
+profiling_panel()
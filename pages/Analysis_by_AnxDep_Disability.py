@@ -1,51 +1,43 @@
 import streamlit as st
-from google.oauth2 import service_account
-from google.cloud import bigquery
-import plotly.graph_objects as go
+from telehealth.data import load_cube, load_slices
+from telehealth.figures import cached_figure
+from telehealth.labels import relabel, truncated
+from telehealth.panels import profiling_panel
+from telehealth.profiling import profiled
 import plotly.express as px
 
-@st.cache_data
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
+GROUPS = ['By Presence of Symptoms of Anxiety/Depression', 'By Disability status']
 
-    client = bigquery.Client(credentials=credentials)
+def ridge_figure(data):
+    df = data.select(Group=GROUPS)
 
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT Indicator, `Group`, Subgroup, Time_Period_Start_Date, Value
-    FROM `4weekdataset.dataset`
-    """
-    
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
-
-def plot_ridge_data(data):
-    df = data[data['Group'].isin(['By Presence of Symptoms of Anxiety/Depression', 'By Disability status'])]
-
-    st.title("Ridge Plot")
     fig_overview = px.area(df, x='Time_Period_Start_Date', y='Value', color='Subgroup', line_group='Indicator',
                        labels={'Value': 'Density'})
     fig_overview.update_layout(legend=dict(orientation='h', y=1.35, x=0))
-    st.plotly_chart(fig_overview)
+    return fig_overview
 
+@st.fragment
+@profiled
+def plot_ridge_data(data):
+    st.title("Ridge Plot")
+    st.plotly_chart(cached_figure(ridge_figure, data))
+
+@st.fragment
+@profiled
 def plot_stream_graph(data):
     st.title("Stream Graph")
-    df = data[data['Group'].isin(['By Presence of Symptoms of Anxiety/Depression', 'By Disability status'])]
 
     # Get unique indicators for the selectbox widget
-    available_indicators = df['Indicator'].unique()
+    available_indicators = data.unique('Indicator', Group=GROUPS)
 
     # Allow the user to select indicators dynamically
     selected_indicator = st.selectbox("Select Indicator", available_indicators, index=0)
 
     # Filter data based on the selected indicator
-    df_selected = df[df['Indicator'] == selected_indicator]
+    df_selected = data.select(Group=GROUPS, Indicator=selected_indicator)
 
-    # Pivot the DataFrame for display
-    df_pivot = df_selected.pivot(index='Subgroup', columns='Time_Period_Start_Date', values='Value')
+    # Subgroup x time period table for display
+    df_pivot = load_cube(*GROUPS).table('Subgroup', 'Time_Period_Start_Date', Indicator=selected_indicator)
 
     st.table(df_pivot)
 
@@ -56,24 +48,26 @@ def plot_stream_graph(data):
     fig_stream.update_layout(legend=dict(orientation='h', y=1.5, x=0))
     st.plotly_chart(fig_stream)
 
+@st.fragment
+@profiled
 def plot_grouped_bar_chart(data):
     st.title("Grouped Bar Chart ")
-    df = data[data['Group'].isin(['By Presence of Symptoms of Anxiety/Depression', 'By Disability status'])]
 
     # Get unique time periods for the selectbox widget
-    available_time_periods = df['Time_Period_Start_Date'].unique()
+    available_time_periods = data.unique('Time_Period_Start_Date', Group=GROUPS)
 
     # Allow the user to select a time period dynamically
     selected_time_period = st.selectbox("Select Time Period", available_time_periods, index=0)
 
     # Filter data based on the selected time period
-    df_selected = df[df['Time_Period_Start_Date'] == selected_time_period]
+    df_selected = data.select(Group=GROUPS, Time_Period_Start_Date=selected_time_period)
 
     # Truncate x-axis labels
-    df_selected['Subgroup'] = df_selected['Subgroup'].apply(lambda x: x[:15])  # Adjust the number of characters as needed
+    df_selected = df_selected.assign(Subgroup=relabel(df_selected['Subgroup'], truncated, 15))  # Adjust the number of characters as needed
 
-    # Pivot the DataFrame for display
-    df_pivot = df_selected.pivot(index='Indicator', columns='Subgroup', values='Value')
+    # Indicator x subgroup table for display, with the same truncated labels
+    df_pivot = load_cube(*GROUPS).table('Indicator', 'Subgroup', Time_Period_Start_Date=selected_time_period)
+    df_pivot.columns = relabel(df_pivot.columns, truncated, 15)
 
     st.table(df_pivot)
 
@@ -94,7 +88,7 @@ def plot_grouped_bar_chart(data):
 st.write("### Anxiety/Depression and Disability status Analysis")
 
 # Load data from BigQuery
-data = load_data_from_bigquery()
+data = load_slices(['Indicator', 'Group', 'Subgroup', 'Time_Period_Start_Date', 'Value'])
 
 plot_ridge_data(data)
 
@@ -102,4 +96,4 @@ plot_stream_graph(data)
 
 plot_grouped_bar_chart(data)
 
-
+profiling_panel()
@@ -1,70 +1,51 @@
 import streamlit as st
-import pandas as pd
-import seaborn as sns
 import plotly.express as px
-from itertools import cycle
-import matplotlib.pyplot as plt
-from plotly.subplots import make_subplots
 import plotly.graph_objects as go
-from google.oauth2 import service_account
-from google.cloud import bigquery
-
-sns.set(style="darkgrid", palette="pastel")
-
-# Load data from BigQuery
-@st.cache_data
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-
-    client = bigquery.Client(credentials=credentials)
-
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT Indicator, `Group`, Subgroup, Time_Period_Label, Time_Period_Start_Date, Value
-    FROM `4weekdataset.dataset`
-    """
-    
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
+from telehealth.data import load_cube, load_hierarchy, load_slices
+from telehealth.figures import cached_figure
+from telehealth.labels import relabel, truncated
+from telehealth.panels import profiling_panel
+from telehealth.profiling import profiled
+
+def sunburst_figure(data):
+    # Indicator > education level > time frame nodes, built once per data version
+    nodes = load_hierarchy(['Indicator', 'Subgroup', 'Time_Period_Start_Date'], Group='By Education')
+
+    # Create Sunburst Chart from the prebuilt nodes
+    fig = go.Figure(go.Sunburst(ids=nodes['ids'], labels=nodes['labels'], parents=nodes['parents'],
+                                values=nodes['values'], branchvalues='total',
+                                hovertemplate='labels=%{label}<br>Value=%{value}<br>parent=%{parent}<br>id=%{id}<extra></extra>'))
+    fig.update_layout(title_text="Sunburst Chart: Indicators, Education Levels, and Time Frames",
+                      sunburstcolorway=px.colors.qualitative.Light24)
+    fig.update_layout(width=800, height=800)
+    return fig
 
+@st.fragment
+@profiled
 def plot_sunburst_chart(data):
     st.title("Sunburst Chart: Indicators, Education Levels, and Time Frames")
 
-    # Sample data preparation, replace with your actual data and column names
-    df = data[data['Group'].isin(['By Education'])]
-
-    # Create Sunburst Chart using Plotly Express
-    fig = px.sunburst(df, 
-                      path=['Indicator', 'Subgroup', 'Time_Period_Start_Date'],
-                      values='Value',
-                      title="Sunburst Chart: Indicators, Education Levels, and Time Frames",
-                      color_discrete_sequence=px.colors.qualitative.Light24)
-    fig.update_layout(width=800, height=800)
-
-    # Display the chart
-    st.plotly_chart(fig)
+    # Display the chart, built once per data version
+    st.plotly_chart(cached_figure(sunburst_figure, data))
 
+@st.fragment
+@profiled
 def plot_proportional_area_chart(data):
     st.title("Proportional Area Chart")
 
-    # Sample data preparation, replace with your actual data and column names
-    df = data[data['Group'].isin(['By Education'])]
-
     # Get unique education levels
-    unique_education_levels = df['Subgroup'].unique()
+    unique_education_levels = data.unique('Subgroup', Group='By Education')
 
     # User selects education level
     selected_education_level = st.selectbox("Select Education Level", unique_education_levels)
 
     # Filter data based on user-selected education level
-    selected_data = df[df['Subgroup'] == selected_education_level]
+    selected_data = data.select(Group='By Education', Subgroup=selected_education_level)
 
-    selected_data['Indicator'] = selected_data['Indicator'].apply(lambda x: x[:25])
+    selected_data = selected_data.assign(Indicator=relabel(selected_data['Indicator'], truncated, 25))
 
-    pivoted_data_table = selected_data.pivot_table(index='Indicator', columns='Time_Period_Start_Date', values='Value', aggfunc='first')
+    pivoted_data_table = load_cube('By Education').table('Indicator', 'Time_Period_Start_Date', Subgroup=selected_education_level)
+    pivoted_data_table.index = relabel(pivoted_data_table.index, truncated, 25)
 
     # Display the table
     st.write(pivoted_data_table)
@@ -82,17 +63,17 @@ def plot_proportional_area_chart(data):
     # Display the chart
     st.plotly_chart(fig)
 
+@st.fragment
+@profiled
 def plot_value_by_indicator(data):
-    # Filter data for age groups
-    df = data[data['Group'].isin(['By Education'])]
-    unique_indicators = df['Indicator'].unique()
+    # Indicators within the education groups
+    unique_indicators = data.unique('Indicator', Group='By Education')
     st.title("Heat Matrix")
     # User selects indicator
     selected_time_period = st.selectbox("Select Indicator", unique_indicators)
 
-    # Filter data based on user-selected indicator
-    selected_data = df[df['Indicator'] == selected_time_period]
-    df = selected_data.pivot(index='Subgroup', columns='Time_Period_Label', values='Value')
+    # Education level x time period table for the user-selected indicator
+    df = load_cube('By Education').table('Subgroup', 'Time_Period_Label', Indicator=selected_time_period)
     df = df.reset_index()
     st.write(df)
 
@@ -109,10 +90,12 @@ def plot_value_by_indicator(data):
 st.title("Education Analysis")
 
 # Load data from BigQuery
-data = load_data_from_bigquery()
+data = load_slices(['Indicator', 'Group', 'Subgroup', 'Time_Period_Label', 'Time_Period_Start_Date', 'Value'])
 
 plot_sunburst_chart(data)
 
 plot_proportional_area_chart(data)
 # Plot Heatmap for Detailed Comparison
-plot_value_by_indicator(data)
\ No newline at end of file
+plot_value_by_indicator(data)
+
+profiling_panel()
@@ -1,51 +1,42 @@
 import streamlit as st
-from google.oauth2 import service_account
-from google.cloud import bigquery
-import plotly.graph_objects as go
+from telehealth.data import load_hierarchy, load_slices, load_summaries
+from telehealth.figures import cached_figure
+from telehealth.labels import relabel, short_indicator, short_subgroup
+from telehealth.panels import profiling_panel
+from telehealth.profiling import profiled
 import plotly.express as px
-import pandas as pd
-
-@st.cache_data
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-
-    client = bigquery.Client(credentials=credentials)
+import plotly.graph_objects as go
 
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT Indicator, `Group`, Subgroup, Time_Period_Label, Time_Period_End_Date, Value, Code
-    FROM `4weekdataset.dataset`
-    """
 
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
+def sunburst_figure(data, selected_time_period):
+    # Subgroup > indicator nodes for this period, built once per data version
+    nodes = load_hierarchy(['Subgroup', 'Indicator'], Group='By Race/Hispanic ethnicity',
+                           Time_Period_End_Date=selected_time_period)
 
+    # Shorter subgroup names, wherever they show
+    names = {column: relabel(nodes[column], short_subgroup) for column in ['ids', 'labels', 'parents']}
+    fig = go.Figure(go.Sunburst(**names, values=nodes['values'], branchvalues='total',
+                                hovertemplate='labels=%{label}<br>Value=%{value}<br>parent=%{parent}<br>id=%{id}<extra></extra>'))
+    fig.update_layout(width=800, height=800, margin=dict(t=60))
+    return fig
 
+@st.fragment
+@profiled
 def plot_value_by_time_period(data):
     st.title("Sunburst Chart")
-    data = data[data['Group'].isin(['By Race/Hispanic ethnicity'])]
-    unique_time_periods = data['Time_Period_End_Date'].unique()
+    unique_time_periods = data.unique('Time_Period_End_Date', Group='By Race/Hispanic ethnicity')
     selected_time_period = st.select_slider("Select 4 Week Time Period End Date", options=unique_time_periods)
 
-    selected_data = data[data['Time_Period_End_Date'] == selected_time_period]
-    df = selected_data
-    df['Subgroup'] = df['Subgroup'].str.replace(r'Non-Hispanic', '')
-    df['Subgroup'] = df['Subgroup'].str.replace(r', o', 'O')
-    fig = px.sunburst(df, path=['Subgroup', 'Indicator'], values='Value')
-    fig.update_layout(width=800, height=800)
-    st.plotly_chart(fig)
+    st.plotly_chart(cached_figure(sunburst_figure, data, selected_time_period))
 
-def plot_value_by_indicator(df):
+@st.fragment
+@profiled
+def plot_value_by_indicator(data):
     st.title("Donut Chart")
 
-    df = df[df['Group'].isin(['By Race/Hispanic ethnicity'])]
-    df['Indicator'] = df['Indicator'].str.replace(r', Last 4 Weeks', '')
-    selected_indicator = st.radio("Select Indicator", df['Indicator'].unique())
-    filtered_df = df[df['Indicator'] == selected_indicator]
-    avg_df = filtered_df.groupby(['Indicator', 'Subgroup'])['Value'].mean().reset_index()
+    indicators = data.unique('Indicator', Group='By Race/Hispanic ethnicity')
+    selected_indicator = st.radio("Select Indicator", indicators, format_func=short_indicator)
+    avg_df = load_summaries().subgroup_means('By Race/Hispanic ethnicity', selected_indicator)
 
     fig = px.pie(avg_df, values='Value', names='Subgroup', hole=0.5,
                  labels={'Value': 'Average Value'})
@@ -54,15 +45,16 @@ def plot_value_by_indicator(df):
 
     st.plotly_chart(fig)
 
+@st.fragment
+@profiled
 def plot_value_by_race(data):
     st.title("Stacked Bar Chart")
 
-    df = data[data['Group'].isin(['By Race/Hispanic ethnicity'])]
-    unique_indicators = df['Subgroup'].unique()
+    unique_indicators = data.unique('Subgroup', Group='By Race/Hispanic ethnicity')
     selected_time_period = st.selectbox("Select Subgroup", unique_indicators)
 
     # Filter data based on user-selected indicator
-    selected_data = df[df['Subgroup'] == selected_time_period]
+    selected_data = data.select(Group='By Race/Hispanic ethnicity', Subgroup=selected_time_period)
 
     fig = px.bar(selected_data, x='Time_Period_Label', y='Value', color='Indicator',
                  labels={'Value': 'Value', 'Indicator': 'Indicators'},
@@ -75,8 +67,10 @@ def plot_value_by_race(data):
 st.title("Ethnicity Analysis")
 
 # Load data from BigQuery
-data = load_data_from_bigquery()
+data = load_slices(['Indicator', 'Group', 'Subgroup', 'Time_Period_Label', 'Time_Period_End_Date', 'Value', 'Code'])
 
 plot_value_by_time_period(data)
 plot_value_by_indicator(data)
 plot_value_by_race(data)
+
+profiling_panel()
@@ -1,48 +1,35 @@
 import streamlit as st
 import pandas as pd
-import seaborn as sns
 import plotly.express as px
 import plotly.graph_objects as go
-from google.oauth2 import service_account
-from google.cloud import bigquery
+from telehealth.data import load_cube, load_slices
+from telehealth.figures import cached_figure
+from telehealth.labels import relabel, truncated
+from telehealth.panels import profiling_panel
+from telehealth.profiling import profiled
 
-sns.set(style="darkgrid", palette="pastel")
-
-# Load data from BigQuery
-@st.cache_data
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-
-    client = bigquery.Client(credentials=credentials)
-
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT Indicator, `Group`, Subgroup, Time_Period_Start_Date, Value, Phase
-    FROM `4weekdataset.dataset`
-    """
-    
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
-
-def plot_gender_data(data):
+def parcats_figure(data):
     # Filter data for Male and Female subgroups
-    gender_data = data[data['Subgroup'].isin(['Male', 'Female'])]
+    gender_data = data.select(['Subgroup', 'Indicator', 'Time_Period_Start_Date'], Subgroup=['Male', 'Female'])
 
-    st.title("Parallel Sets")
-    #Create dimensions
-    indicator_dim = go.parcats.Dimension(values=gender_data['Indicator'].apply(lambda x: x[:28]), label="Indicator")
-    subgroup_dim = go.parcats.Dimension(values=gender_data['Subgroup'], label="Subgroup")
-    value_dim = go.parcats.Dimension(values=gender_data['Time_Period_Start_Date'], label="Time Period")
+    # One line per Subgroup/Indicator/period combination, weighted by its
+    # number of rows, so the chart scales with combinations rather than rows
+    combinations = (gender_data.groupby(['Subgroup', 'Indicator', 'Time_Period_Start_Date'], observed=True, sort=False)
+                    .size().reset_index(name='count'))
+
+    #Create dimensions, with indicator names shortened once per category
+    short_indicators = relabel(combinations['Indicator'], truncated, 28).to_numpy(dtype=object)
+    indicator_dim = go.parcats.Dimension(values=short_indicators, label="Indicator")
+    subgroup_dim = go.parcats.Dimension(values=combinations['Subgroup'], label="Subgroup")
+    value_dim = go.parcats.Dimension(values=combinations['Time_Period_Start_Date'], label="Time Period")
 
     # Convert 'Subgroup' to colors
     color_mapping = {'Male': '#0047ff', 'Female': '#F603A3'}
-    color = gender_data['Subgroup'].map(color_mapping)
+    color = combinations['Subgroup'].map(color_mapping)
 
     fig = go.Figure(data=[go.Parcats(
         dimensions=[subgroup_dim, indicator_dim, value_dim],
+        counts=combinations['count'],
         line={'color': color},
         hoveron='color', hoverinfo='count+probability',
         labelfont={'size': 18, 'family': 'Times'},
@@ -50,23 +37,19 @@ def plot_gender_data(data):
         arrangement='freeform',
     )])
     fig.update_layout(title_text='Male and Female overview over Indicators and Time Period')
+    return fig
 
+@st.fragment
+@profiled
+def plot_gender_data(data):
+    st.title("Parallel Sets")
 
-    # Display the Parcats plot
-    st.plotly_chart(fig)
-
-def plot_gender_compare_data(data):
-    # Filter data for Male and Female subgroups
-    gender_data = data[data['Subgroup'].isin(['Male', 'Female'])]
-
-    st.title("Line Graph")
-
-    # Get unique indicators and create a color palette
-    unique_indicators = gender_data['Indicator'].unique()
-    selected_indicators = st.multiselect("Select Indicators", unique_indicators, default=unique_indicators)
+    # Display the Parcats plot, built once per data version
+    st.plotly_chart(cached_figure(parcats_figure, data))
 
+def compare_figure(data, selected_indicators):
     # Filter data based on selected indicators
-    filtered_data = gender_data[gender_data['Indicator'].isin(selected_indicators)]
+    filtered_data = data.select(Subgroup=['Male', 'Female'], Indicator=list(selected_indicators))
 
     # Create Line Chart using Plotly Express with a specific template
     fig = px.line(filtered_data, x='Time_Period_Start_Date', y='Value', color='Indicator', line_shape='linear',
@@ -76,29 +59,38 @@ def plot_gender_compare_data(data):
 
     # Customize legend position
     fig.update_layout(legend=dict(orientation='h', y=2, x=0), xaxis_title='Time_Period_Start_Date', yaxis_title='Value')
+    return fig
+
+@st.fragment
+@profiled
+def plot_gender_compare_data(data):
+    st.title("Line Graph")
 
-    # Display the plot in Streamlit
-    st.plotly_chart(fig)
+    # Get unique indicators and create a color palette
+    unique_indicators = data.unique('Indicator', Subgroup=['Male', 'Female'])
+    selected_indicators = st.multiselect("Select Indicators", unique_indicators, default=unique_indicators)
+
+    # Display the plot in Streamlit, reusing any session's figure for this selection
+    st.plotly_chart(cached_figure(compare_figure, data, tuple(selected_indicators)))
     
 
+@st.fragment
+@profiled
 def plot_value_by_indicator_and_gender(data):
-    # Filter data for gender groups
-    gender_data = data[data['Subgroup'].isin(['Male', 'Female'])]
-
     st.title("Multi-set Bar Chart Over Indicator")
     # Get unique genders and indicators
-    unique_genders = gender_data['Subgroup'].unique()
+    unique_genders = data.unique('Subgroup', Subgroup=['Male', 'Female'])
 
     # User selects gender
     selected_gender = st.selectbox("Select Gender", unique_genders)
 
     # Filter data based on user-selected gender
-    selected_data = data[data['Subgroup'] == selected_gender]
+    selected_data = data.select(Subgroup=selected_gender)
 
     st.write(f"**Value by Indicator for {selected_gender} over Time**")
 
-    # Pivot the data for a cleaner display in the table
-    pivoted_data_table = selected_data.pivot_table(index='Indicator', columns='Time_Period_Start_Date', values='Value', aggfunc='first')
+    # Indicator x time period table for a cleaner display
+    pivoted_data_table = load_cube('By Sex').table('Indicator', 'Time_Period_Start_Date', Subgroup=selected_gender)
 
     # Display the table
     st.write("Data Table:")
@@ -124,26 +116,24 @@ def plot_value_by_indicator_and_gender(data):
 
     st.plotly_chart(bar_chart, use_container_width=True)
 
+@st.fragment
+@profiled
 def plot_value_by_indicator(data):
-    # Filter data for gender groups
-    gender_data = data[data['Group'].isin(['By Sex'])]
-    
     st.title("Multi-set Bar Chart Over Genders")
 
     # Get unique indicators and time periods
-    unique_indicators = gender_data['Indicator'].unique()
+    unique_indicators = data.unique('Indicator', Group='By Sex')
 
     # User selects indicator
     selected_indicator = st.selectbox("Select Indicator", unique_indicators)
 
-    # Filter data based on user-selected indicator
-    selected_data = gender_data[gender_data['Indicator'] == selected_indicator]
-
-    selected_data['Subgroup'] = pd.Categorical(selected_data['Subgroup'], categories=['Female', 'Male'], ordered=True)
-    selected_data.sort_values(by=['Time_Period_Start_Date', 'Subgroup'], inplace=True)
+    # Filter data based on user-selected indicator, ordered Female then Male in each period
+    selected_data = data.select(Group='By Sex', Indicator=selected_indicator)
+    selected_data = (selected_data.assign(Subgroup=pd.Categorical(selected_data['Subgroup'], categories=['Female', 'Male'], ordered=True))
+                     .sort_values(by=['Time_Period_Start_Date', 'Subgroup']))
 
-    # Pivot the data for a cleaner display in the table
-    pivoted_data_table = selected_data.pivot_table(index='Subgroup', columns='Time_Period_Start_Date', values='Value', aggfunc='first')
+    # Gender x time period table for a cleaner display
+    pivoted_data_table = load_cube('By Sex').table('Subgroup', 'Time_Period_Start_Date', Indicator=selected_indicator)
 
     # Display the table
     st.write("Data Table:")
@@ -177,7 +167,7 @@ def plot_value_by_indicator(data):
 st.title("Gender Analysis")
 
 # Load data from BigQuery
-data = load_data_from_bigquery()
+data = load_slices(['Indicator', 'Group', 'Subgroup', 'Time_Period_Start_Date', 'Value', 'Phase'])
 
 # Assuming 'data_merged' is your DataFrame
 plot_gender_data(data)
@@ -187,4 +177,6 @@ plot_gender_compare_data(data)
 # Additional comparison graph
 plot_value_by_indicator_and_gender(data)
 
-plot_value_by_indicator(data)
\ No newline at end of file
+plot_value_by_indicator(data)
+
+profiling_panel()
@@ -1,39 +1,21 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from google.oauth2 import service_account
-from google.cloud import bigquery
-
-# Load data from BigQuery
-@st.cache_data
-# Function to load data from BigQuery
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-
-    client = bigquery.Client(credentials=credentials)
-
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT Indicator, `Group`, State, Time_Period_End_Date, Value, Code
-    FROM `4weekdataset.dataset`
-    """
-    
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
+from telehealth.data import load_cube, load_slices, load_summaries
+from telehealth.figures import cached_figure
+from telehealth.panels import profiling_panel
+from telehealth.profiling import profiled
 
 
 # Function to create choropleth map
-def create_choropleth_map(data, unique_indicators):
+@profiled
+def create_choropleth_map(data, selected_indicator):
     st.title("Choropleth Map")
 
-    filtered_data = data[(data['Group'] == 'By State') & (data['Indicator'] == selected_indicator)]
-
-    # Calculate the mean value for each state and indicator combination
-    mean_data = filtered_data.groupby('Code')['Value'].mean().reset_index()
+    # Mean value for each state and indicator combination, precomputed
+    mean_data = load_summaries().state_means('Code', selected_indicator)
 
     # Create choropleth map using Plotly graph objects
     fig = go.Figure(go.Choropleth(
@@ -53,13 +35,12 @@ def create_choropleth_map(data, unique_indicators):
 
     st.plotly_chart(fig)
 
-def create_chart(data, unique_indicators):
+@profiled
+def create_chart(data, selected_indicator):
     st.title(f"**Compare Top 10 vs Bottom 10 States**")
 
-    filtered_data = data[(data['Group'] == 'By State') & (data['Indicator'] == selected_indicator)]
-
-    # Calculate the mean value for each state and indicator combination
-    mean_data = filtered_data.groupby('State')['Value'].mean().reset_index()
+    # Mean value for each state and indicator combination, precomputed
+    mean_data = load_summaries().state_means('State', selected_indicator)
 
     # Sort values based on the mean value
     mean_data = mean_data.sort_values(by='Value', ascending=False)
@@ -82,47 +63,90 @@ def create_chart(data, unique_indicators):
 
     st.plotly_chart(fig)
 
-def create_animation(data, unique_indicators):
-    st.title(f"**States Animation over time**")
-
-    state_group_df = data[data['Indicator'] == 'Needed Counseling or Therapy But Did Not Get It, Last 4 Weeks'].copy()
-    Neededf = state_group_df[state_group_df['Group'] == 'By State'].copy()
-    Neededf['Time_Period_End_Date'] = Neededf['Time_Period_End_Date'].astype(str)
-
-    # Create choropleth map
-    fig = px.choropleth(Neededf,
-                    locations="Code",
-                    color="Value",
-                    animation_frame="Time_Period_End_Date",
-                    locationmode='USA-states',
-                    title='Needed Counseling or Therapy But Did Not Get It, Last 4 Weeks',
-                    labels={'Value': 'Indicator Value', 'Indicator': 'Mental Health Indicator'},
-                    color_continuous_scale="Rdbu",
-                    range_color=(state_group_df['Value'].min(), state_group_df['Value'].max()))
-
+# The selected indicator's values over time. Frames come from the By State
+# cube's state x period slice and only carry z; locations, hover labels and
+# the colour range (fixed across frames) are sent once.
+def animation_figure(data, selected_indicator):
+    cube = load_cube('By State')
+    codes = (data.select(['Subgroup', 'Code'], Group='By State')
+             .drop_duplicates('Subgroup').set_index('Subgroup')['Code'])
+    ends = cube.periods['Time_Period_End_Date'].astype(str).to_numpy()
+
+    values = cube.values[cube.indicators.get_loc(selected_indicator)]
+    states = ~np.isnan(values).all(axis=1)
+    periods = np.flatnonzero(~np.isnan(values).all(axis=0))
+    values = values[states]
+
+    fig = go.Figure(
+        data=[go.Choropleth(
+            locations=codes.reindex(cube.subgroups[states]).to_numpy(),
+            z=values[:, periods[0]],
+            text=cube.subgroups[states],
+            locationmode='USA-states',
+            colorscale='Rdbu',
+            zmin=np.nanmin(values),
+            zmax=np.nanmax(values),
+            colorbar_title='Indicator Value',
+            hovertemplate='%{text}<br>Indicator Value=%{z}<extra></extra>',
+        )],
+        frames=[go.Frame(name=ends[k], data=[go.Choropleth(z=values[:, k])], traces=[0]) for k in periods],
+    )
 
+    # Play/pause buttons and a time slider, laid out like Plotly Express does
+    play = dict(frame=dict(duration=500, redraw=True), mode='immediate', fromcurrent=True, transition=dict(duration=0))
+    jump = dict(frame=dict(duration=0, redraw=True), mode='immediate')
     fig.update_layout(
-        title_text=f'{selected_indicator}',
+        title_text=selected_indicator,
         geo_scope='usa',
         width=800,
-        height=600 
+        height=600,
+        updatemenus=[dict(type='buttons', direction='left', showactive=False, x=0.1, y=0, xanchor='right', yanchor='top',
+                          pad=dict(r=10, t=70),
+                          buttons=[dict(label='&#9654;', method='animate', args=[None, play]),
+                                   dict(label='&#9724;', method='animate', args=[[None], jump])])],
+        sliders=[dict(active=0, x=0.1, y=0, len=0.9, xanchor='left', yanchor='top', pad=dict(b=10, t=60),
+                      currentvalue=dict(prefix='Time_Period_End_Date='),
+                      steps=[dict(label=ends[k], method='animate', args=[[ends[k]], jump]) for k in periods])],
     )
 
-    st.plotly_chart(fig)
+    return fig
+
+@profiled
+def create_animation(data, selected_indicator):
+    st.title(f"**States Animation over time**")
+
+    # Nothing to animate without at least one period with a state value
+    cube = load_cube('By State')
+    if (selected_indicator not in cube.indicators
+            or np.isnan(cube.values[cube.indicators.get_loc(selected_indicator)]).all()):
+        st.info("No state estimates for this indicator.")
+        return
+
+    # Built once per indicator and data version for all sessions
+    st.plotly_chart(cached_figure(animation_figure, data, selected_indicator))
+
+# The indicator dropdown drives all three charts, and changing it reruns
+# just them
+@st.fragment
+@profiled
+def plot_indicator_overview(data):
+    # Get unique indicators
+    unique_indicators = data.unique('Indicator')
+    # Dropdown for selecting an indicator
+    selected_indicator = st.selectbox("Select Indicator", unique_indicators)
+
+    create_choropleth_map(data, selected_indicator)
+
+    create_chart(data, selected_indicator)
+
+    create_animation(data, selected_indicator)
 
 # Main Streamlit app
 st.title("State Analysis")
 
 # Load data from BigQuery
-data = load_data_from_bigquery()
-
-# Get unique indicators
-unique_indicators = data['Indicator'].unique()
-# Dropdown for selecting an indicator
-selected_indicator = st.selectbox("Select Indicator", unique_indicators)
-
-create_choropleth_map(data, unique_indicators)
+data = load_slices(['Indicator', 'Group', 'Subgroup', 'State', 'Time_Period_End_Date', 'Value', 'Code'])
 
-create_chart(data, unique_indicators)
+plot_indicator_overview(data)
 
-create_animation(data, unique_indicators)
+profiling_panel()
@@ -1,56 +1,47 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from prophet import Prophet
-from google.oauth2 import service_account
-from google.cloud import bigquery
+from telehealth.data import load_slices
+from telehealth.engines import ENGINES
+from telehealth.forecast import default_engine, forecast_series, get_forecast
+from telehealth.panels import profiling_panel
+from telehealth.profiling import profiled
 
 
-@st.cache_data
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-
-    client = bigquery.Client(credentials=credentials)
-
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT Indicator, `Group`, Subgroup, Time_Period_Start_Date, Value
-    FROM `4weekdataset.dataset`
-    """
-    
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
-
+@st.fragment
+@profiled
 def generate_prophet_forecast(data):
-    # Filter data for age groups
-    df = data[data['Subgroup'].isin(['United States'])]
     st.title("Prophet predictions")
+
+    # User picks Prophet or the much faster Holt-Winters engine
+    engine_names = list(ENGINES)
+    selected_engine = st.radio("Select Forecast Engine", engine_names, index=engine_names.index(default_engine()),
+                               format_func=lambda name: ENGINES[name].label, horizontal=True)
+
+    # User selects the series, starting from the national estimate
+    groups = data.unique('Group')
+    selected_group = st.selectbox("Select Group", groups,
+                                  index=groups.index('National Estimate') if 'National Estimate' in groups else 0)
+    selected_subgroup = st.selectbox("Select Subgroup", data.unique('Subgroup', Group=selected_group))
     
     # User selects indicator
-    selected_indicator = st.radio("Select Indicator", df['Indicator'].unique())
+    selected_indicator = st.radio("Select Indicator",
+                                  data.unique('Indicator', Group=selected_group, Subgroup=selected_subgroup))
 
     # Filter data based on user-selected indicator
-    selected_data = df[df['Indicator'] == selected_indicator]
+    selected_data = data.select(Group=selected_group, Subgroup=selected_subgroup, Indicator=selected_indicator)
     df = selected_data.pivot(index='Time_Period_Start_Date', columns='Subgroup', values='Value')
     
     st.write(df)
 
-    df_Prophet = df.reset_index().rename(columns={'Time_Period_Start_Date': 'ds', 'United States': 'y'})  # Rename columns as required by Prophet
-    df_Prophet['ds'] = pd.to_datetime(df_Prophet['ds'])
-
-    # Create and fit the model
-    model = Prophet()
-    model.fit(df_Prophet)
+    df_Prophet = forecast_series(selected_data)  # ds and y columns as required by Prophet
 
-    # Create a DataFrame with future dates for prediction
-    future = model.make_future_dataframe(periods=12, freq='W')  # Adjust the number of periods as needed
-
-    # Make predictions
-    forecast = model.predict(future)
+    # Precomputed by telehealth.batch_forecast when available, otherwise fit
+    # now (or reuse an earlier fit of this series)
+    forecast = get_forecast(df_Prophet, selected_indicator, selected_group, selected_subgroup,
+                            periods=12, freq='W', engine=selected_engine)  # Adjust the number of periods as needed
+    if forecast is None:
+        st.warning("This series has too few values to forecast.")
+        return
 
     # Plot the forecast with uncertainty intervals
     fig = go.Figure()
@@ -86,7 +77,7 @@ def generate_prophet_forecast(data):
         autosize=False,
         width=800,
         height=400,
-        title_text='Prophet Forecast with Uncertainty Intervals',
+        title_text=f'{ENGINES[selected_engine].label} Forecast with Uncertainty Intervals',
         xaxis_title='Date',
         yaxis_title='Forecasted Value'
     )
@@ -99,6 +90,8 @@ def generate_prophet_forecast(data):
 st.title("Prophet Analysis of Indicator trend")
 
 # Load data from BigQuery
-data = load_data_from_bigquery()
+data = load_slices(['Indicator', 'Group', 'Subgroup', 'Time_Period_Start_Date', 'Value'])
+
+generate_prophet_forecast(data)
 
-generate_prophet_forecast(data)
\ No newline at end of file
+profiling_panel()
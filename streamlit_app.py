@@ -1,10 +1,10 @@
-import altair as alt
-import numpy as np
-import pandas as pd
 import streamlit as st
-import plotly.express as px
-from google.oauth2 import service_account
-from google.cloud import bigquery
+import plotly.graph_objects as go
+from telehealth.browser import dataset_browser
+from telehealth.data import load_slices, load_summaries
+from telehealth.figures import cached_figure
+from telehealth.panels import connection_metrics, profiling_panel
+from telehealth.profiling import profiled
 
 
 """
@@ -28,50 +28,38 @@ from google.cloud import bigquery
 #### Collab EDA - [Collab Link](https://colab.research.google.com/drive/17297HG3a7O9vq_F0o9qIwRAGgdigMj_a?usp=sharing)
 
 """
-# Load data in the main app file
-@st.cache_data
-def load_data_from_bigquery():
-    credentials = service_account.Credentials.from_service_account_info(
-        st.secrets["gcp_service_account"]
-    )
-
-    client = bigquery.Client(credentials=credentials)
-
-    # Define your BigQuery SQL query to fetch only necessary columns
-    query = f"""
-    SELECT *
-    FROM `4weekdataset.dataset`
-    """
-    
-    # Execute the query and load the results into a DataFrame
-    data = client.query(query).to_dataframe()
-    return data
-
-def create_treemap(data):
-    # Calculate the mean value for each subgroup
-    df_mean = data.groupby(['Indicator', 'Group', 'Subgroup', 'State'])['Value'].mean().reset_index()
-
-    st.title("TreeMap  data Overview")
+def treemap_figure(summaries):
+    # Mean value for each subgroup as treemap nodes, precomputed once per data version
+    nodes = summaries.treemap
 
     # Create Treemap
-    fig_treemap = px.treemap(df_mean, path=['Indicator', 'Group', 'Subgroup', 'State'], values='Value',
-                             color='Value', color_continuous_scale='Viridis')
+    fig_treemap = go.Figure(go.Treemap(
+        ids=nodes['ids'], labels=nodes['labels'], parents=nodes['parents'], values=nodes['values'],
+        branchvalues='total', marker=dict(colors=nodes['color'], coloraxis='coloraxis'),
+        hovertemplate='labels=%{label}<br>Value_sum=%{value}<br>parent=%{parent}<br>id=%{id}<br>Value=%{color}<extra></extra>'))
 
     # Adjust the size of the Treemap
-    fig_treemap.update_layout(height=700, width=800)
+    fig_treemap.update_layout(height=700, width=800, margin=dict(t=60),
+                              coloraxis=dict(colorscale='Viridis', colorbar_title='Value'))
+    return fig_treemap
 
-    st.plotly_chart(fig_treemap)
 
+@profiled
+def create_treemap(summaries):
+    st.title("TreeMap  data Overview")
+
+    # Built once per data version and shared by every visitor
+    st.plotly_chart(cached_figure(treemap_figure, summaries))
 
-# Load data
-data = load_data_from_bigquery()
 
 #selected_time_period = st.selectbox("Select Time Period Label", data['Time_Period_Label'].unique())
-create_treemap(data)
+create_treemap(load_summaries())
 
-# Display the data table
+# Display the data table, one page at a time
 st.write("## Data Set")
-st.dataframe(data)
+dataset_browser(load_slices())
+connection_metrics()
+profiling_panel()
 
 # Key Questions
 st.header("Key Questions")
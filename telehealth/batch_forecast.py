@@ -0,0 +1,101 @@
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from telehealth import config, dtypes, forecast, snapshot
+from telehealth.engines import ENGINES, future_dates
+
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+
+def _init_worker():
+    # Prophet's Stan backend logs every fit at INFO. Its logger is set up on
+    # first use, so set it up before quieting it.
+    try:
+        from cmdstanpy.utils import get_logger
+    except ImportError:
+        return
+    get_logger().setLevel(logging.WARNING)
+
+
+# Each worker gets a chunk of series, which the fast engine fits in one
+# vectorized pass and Prophet fits one after another
+def _fit_chunk(job):
+    engine, keys, series_list, periods, freq = job
+    futures = [future_dates(series, periods, freq) for series in series_list]
+    results = []
+    for key, series, entry in zip(keys, series_list, ENGINES[engine].forecast_many(series_list, futures)):
+        if entry is None:
+            results.append((key, None))
+            continue
+        indicator, group, subgroup = key
+        results.append((key, entry["forecast"][FORECAST_COLUMNS].assign(
+            Indicator=indicator, Group=group, Subgroup=subgroup, fingerprint=forecast.series_fingerprint(series),
+            engine=engine, periods=periods, freq=freq)))
+    return results
+
+
+# One (key, ds/y frame) per (Indicator, Group, Subgroup) series in the dataset
+def forecast_series(data):
+    for key, rows in data.groupby(forecast.KEY_COLUMNS, observed=True, sort=False):
+        yield key, forecast.forecast_series(rows)
+
+
+# Fit every series in parallel across worker processes
+def run(data, periods=12, freq="W", workers=None, engine="prophet"):
+    keys, series_list = zip(*forecast_series(data)) if len(data) else ((), ())
+    workers = workers or os.cpu_count()
+    chunks = np.array_split(np.arange(len(keys)), min(len(keys), workers * 4) or 1)
+    jobs = [(engine, [keys[i] for i in chunk], [series_list[i] for i in chunk], periods, freq)
+            for chunk in chunks if len(chunk)]
+
+    results, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for chunk_results in pool.map(_fit_chunk, jobs):
+            for key, result in chunk_results:
+                if result is None:
+                    failures.append(key)
+                else:
+                    results.append(result)
+
+    table = pd.concat(results, ignore_index=True) if results else pd.DataFrame(columns=FORECAST_COLUMNS)
+    table = table[forecast.KEY_COLUMNS + FORECAST_COLUMNS + ["fingerprint", "engine", "periods", "freq"]]
+    return dtypes.compact(table), failures
+
+
+def read_dataset():
+    if config.data_source() == "snapshot":
+        return dtypes.compact(snapshot.read_snapshot(config.snapshot_path()))
+    from telehealth.data import fetch_from_bigquery
+    return fetch_from_bigquery()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m telehealth.batch_forecast",
+                                     description="Fit forecasts for every Indicator/Group/Subgroup series.")
+    parser.add_argument("--output", default=config.get_setting("forecast_table_path", "data/forecasts.arrow"),
+                        help="Forecast table the Prophet page reads (.arrow or .parquet)")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=forecast.default_engine(),
+                        help="Forecasting engine")
+    parser.add_argument("--periods", type=int, default=12, help="Number of future periods to forecast")
+    parser.add_argument("--freq", default="W", help="Frequency of the future periods")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    table, failures = run(read_dataset(), args.periods, args.freq, args.workers, args.engine)
+    snapshot.write_snapshot(table, args.output)
+
+    for key in failures:
+        print(f"Skipped {' / '.join(key)}: fewer than two values")
+    print(f"Wrote {table[forecast.KEY_COLUMNS].drop_duplicates().shape[0]} {args.engine} forecasts to {args.output} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import math
+
+import streamlit as st
+
+from telehealth.profiling import profiled
+from telehealth.pushdown import PushdownSlices
+
+FILTER_COLUMNS = ["Indicator", "Group", "Subgroup", "State"]
+
+
+# Rows matching the filters, in the requested order. Only these positions are
+# computed per rerun; the rows themselves are fetched a page at a time.
+def matching_positions(index, criteria, sort_by=None, ascending=True):
+    positions = index.positions(**criteria)
+    if sort_by:
+        keys = index.data[sort_by].iloc[positions].reset_index(drop=True)
+        order = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        positions = positions[order.to_numpy()]
+    return positions
+
+
+# How many rows match, and a function fetching `size` of them from `start`.
+# In push-down mode both are queries: a COUNT and a LIMIT/OFFSET page.
+def matching_rows(index, filters, sort_by=None, ascending=True):
+    criteria = {column: values for column, values in filters.items() if values}
+    if isinstance(index, PushdownSlices):
+        return index.count(**criteria), lambda start, size: index.page(start, size, sort_by, ascending, **criteria)
+    positions = matching_positions(index, criteria, sort_by, ascending)
+    return len(positions), lambda start, size: index.data.iloc[positions[start:start + size]]
+
+
+# A filterable, sortable table that only sends the visible page of rows to
+# the browser, so the page stays light however long the history gets. Paging
+# and filtering rerun only this fragment.
+@st.fragment
+@profiled
+def dataset_browser(index, page_size=50, key="browser"):
+    filters = {}
+    columns = st.columns(len(FILTER_COLUMNS))
+    for column, container in zip(FILTER_COLUMNS, columns):
+        # Later filters only offer values within the earlier selections
+        narrowed = {name: values for name, values in filters.items() if values}
+        filters[column] = container.multiselect(column, index.unique(column, **narrowed), key=f"{key}_{column}")
+
+    sort_column, order_column, page_column = st.columns([2, 1, 1])
+    table_columns = index.column_names() if isinstance(index, PushdownSlices) else list(index.data.columns)
+    sort_by = sort_column.selectbox("Sort by", [None] + table_columns, key=f"{key}_sort",
+                                    format_func=lambda name: "Table order" if name is None else name)
+    ascending = order_column.radio("Order", ["Ascending", "Descending"], key=f"{key}_order",
+                                   horizontal=True) == "Ascending"
+
+    total, fetch = matching_rows(index, filters, sort_by, ascending)
+    pages = max(1, math.ceil(total / page_size))
+    page = page_column.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+
+    start = (page - 1) * page_size
+    window = fetch(start, page_size)
+    st.dataframe(window, hide_index=True)
+    st.caption(f"Rows {min(start + 1, total)}-{start + len(window)} of {total}")
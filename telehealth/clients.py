@@ -0,0 +1,57 @@
+import collections
+import contextlib
+import threading
+import time
+
+import numpy as np
+
+
+# One BigQuery client for the whole process. `connect()` returns the client
+# and its credentials (None for stand-ins); it is called once, and every
+# caller after that reuses the same client, HTTP session and access token.
+# Also keeps counts and timings for the metrics panel.
+class BigQueryPool:
+    def __init__(self, connect, max_timings=1000):
+        self._connect = connect
+        self._client = None
+        self._credentials = None
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.refreshes = 0
+        self._timings = collections.defaultdict(lambda: collections.deque(maxlen=max_timings))
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client, self._credentials = self._connect()
+                self.created += 1
+            else:
+                self.reused += 1
+            # Refresh an expired token here, once under the lock, rather than
+            # in every concurrent request that notices
+            if self._credentials is not None and not self._credentials.valid:
+                from google.auth.transport.requests import Request
+                self._credentials.refresh(Request())
+                self.refreshes += 1
+            return self._client
+
+    @contextlib.contextmanager
+    def timed(self, kind):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._timings[kind].append(elapsed)
+
+    def metrics(self):
+        with self._lock:
+            timings = {kind: np.array(values) for kind, values in self._timings.items()}
+            counts = {"clients_created": self.created, "clients_reused": self.reused,
+                      "token_refreshes": self.refreshes}
+        latency = {kind: {"queries": len(values), "mean_s": values.mean(), "p50_s": np.percentile(values, 50),
+                          "p95_s": np.percentile(values, 95), "max_s": values.max()}
+                   for kind, values in timings.items() if len(values)}
+        return counts, latency
@@ -0,0 +1,38 @@
+import os
+
+import streamlit as st
+
+
+# Settings come from an environment variable (TELEHEALTH_<NAME>) first, then
+# from .streamlit/secrets.toml, so the same code runs locally, in CI and on
+# Streamlit Cloud without edits.
+def get_setting(name, default=None):
+    value = os.environ.get(f"TELEHEALTH_{name.upper()}")
+    if value is not None:
+        return value
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        return default
+
+
+def data_source():
+    source = get_setting("data_source", "bigquery")
+    if source not in ("bigquery", "snapshot"):
+        raise ValueError(f"Unknown data_source {source!r}, expected 'bigquery' or 'snapshot'")
+    return source
+
+
+# Push-down mode: with the BigQuery source, pages query just the rows each
+# selection needs instead of loading the whole table
+def pushdown():
+    return str(get_setting("pushdown", "false")).lower() in ("1", "true", "yes")
+
+
+# Diagnostics in the sidebar, off for regular visitors
+def show_metrics():
+    return str(get_setting("show_metrics", "false")).lower() in ("1", "true", "yes")
+
+
+def snapshot_path():
+    return get_setting("snapshot_path", "data/dataset.arrow")
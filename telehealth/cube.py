@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+PERIOD_COLUMNS = ["Time_Period_Start_Date", "Time_Period_End_Date", "Time_Period_Label"]
+
+
+# Values of one or more Groups as a dense indicator x subgroup x period array,
+# with NaN where a combination wasn't published. Indicators and subgroups are
+# sorted like pivot() sorts them and periods run in date order. Tables are
+# handed out as read-only views of the array, so nothing is reshaped per rerun
+# and duplicate rows can't make a pivot fail (the first one wins, like
+# pivot_table(aggfunc='first')).
+class Cube:
+    def __init__(self, data):
+        self.period_columns = [column for column in PERIOD_COLUMNS if column in data]
+        self.periods = (data[self.period_columns]
+                        .drop_duplicates(self.period_columns[0])
+                        .sort_values(self.period_columns[0])
+                        .reset_index(drop=True))
+        self.indicators = pd.Index(sorted(data["Indicator"].dropna().unique()), name="Indicator")
+        self.subgroups = pd.Index(sorted(data["Subgroup"].dropna().unique()), name="Subgroup")
+
+        i = self.indicators.get_indexer(data["Indicator"])
+        j = self.subgroups.get_indexer(data["Subgroup"])
+        k = pd.Index(self.periods[self.period_columns[0]]).get_indexer(data[self.period_columns[0]])
+        present = (i >= 0) & (j >= 0) & (k >= 0)
+
+        shape = (len(self.indicators), len(self.subgroups), len(self.periods))
+        flat = np.ravel_multi_index((i[present], j[present], k[present]), shape)
+        flat, first = np.unique(flat, return_index=True)
+
+        values = np.full(shape, np.nan, dtype=data["Value"].dtype)
+        values.flat[flat] = data["Value"].to_numpy()[present][first]
+        values.flags.writeable = False
+        self.values = values
+
+    def _axis(self, name):
+        if name == "Indicator":
+            return 0, self.indicators
+        if name == "Subgroup":
+            return 1, self.subgroups
+        if name in self.period_columns:
+            return 2, pd.Index(self.periods[name], name=name)
+        raise KeyError(name)
+
+    # A 2-D table like data.pivot(index=index, columns=columns, values='Value')
+    # for the slice where the one remaining axis equals the given value, e.g.
+    # cube.table('Subgroup', 'Time_Period_Label', Indicator=x)
+    def table(self, index, columns, **fixed):
+        [(name, value)] = fixed.items()
+        fixed_axis, labels = self._axis(name)
+        row_axis, rows = self._axis(index)
+        column_axis, cols = self._axis(columns)
+
+        position = np.flatnonzero(labels == value)
+        if len(position) == 0:
+            return pd.DataFrame(index=rows[:0], columns=cols[:0], dtype=self.values.dtype)
+
+        selector = [slice(None)] * 3
+        selector[fixed_axis] = position[0]
+        matrix = self.values[tuple(selector)]
+        if row_axis > column_axis:
+            matrix = matrix.T
+
+        # Drop subgroups/periods with no values in this slice, as pivot would
+        # never have seen them. Only then does the view become a copy.
+        has_row = ~np.isnan(matrix).all(axis=1)
+        has_column = ~np.isnan(matrix).all(axis=0)
+        if not has_row.all() or not has_column.all():
+            matrix, rows, cols = matrix[has_row][:, has_column], rows[has_row], cols[has_column]
+        return pd.DataFrame(matrix, index=rows, columns=cols, copy=False)
@@ -0,0 +1,176 @@
+import functools
+
+import streamlit as st
+
+from telehealth import (clients, config, cube, download, dtypes, hierarchy, incremental, profiling, pushdown, slices,
+                        snapshot, summaries)
+
+TABLE = "4weekdataset.dataset"
+
+
+def _connect():
+    # An offline stand-in serving a local snapshot, for exercising this path
+    # without credentials
+    fake_path = config.get_setting("bigquery_fake_path")
+    if fake_path:
+        from telehealth.fake_bigquery import FakeClient
+        return FakeClient.from_snapshot(fake_path, table=TABLE), None
+
+    # Imported here so snapshot mode never loads the Google client libraries
+    from google.oauth2 import service_account
+    from google.cloud import bigquery
+
+    credentials = service_account.Credentials.from_service_account_info(
+        st.secrets["gcp_service_account"]
+    )
+    return bigquery.Client(credentials=credentials), credentials
+
+
+# Created once per process and shared by every session and thread, so cache
+# misses don't each pay for new credentials, an auth handshake and an HTTP
+# session
+@st.cache_resource
+def bigquery_pool():
+    return clients.BigQueryPool(_connect)
+
+
+def get_bigquery_client():
+    return bigquery_pool().client()
+
+
+def fetch_from_bigquery(client=None):
+    client = client or get_bigquery_client()
+    query = f"""
+    SELECT *
+    FROM `{TABLE}`
+    """
+
+    # Execute the query and stream the results into a DataFrame as Arrow
+    with bigquery_pool().timed("full load"):
+        return dtypes.compact(download.query_to_dataframe(client, query))
+
+
+# The table's last-modified time (or the snapshot file's) is cheap to check,
+# so it is re-read every few minutes and used as the cache key for the full
+# load below.
+@st.cache_data(ttl=600, show_spinner=False)
+def data_version(source):
+    if source == "snapshot":
+        return snapshot.snapshot_version(config.snapshot_path())
+    with bigquery_pool().timed("table metadata"):
+        table = get_bigquery_client().get_table(TABLE)
+    return table.modified.isoformat()
+
+
+# The data source in use and its current version, for caches keyed on both
+def current_version():
+    source = config.data_source()
+    return source, data_version(source)
+
+
+def refresh_from_bigquery(data, client=None):
+    client = client or get_bigquery_client()
+    if data is None:
+        return incremental.stamp(client, TABLE, fetch_from_bigquery(client))
+    # Appended rows arrive as plain object columns, so compact the result again
+    with bigquery_pool().timed("incremental refresh"):
+        return dtypes.compact(incremental.refresh(client, TABLE, data, lambda: fetch_from_bigquery(client)))
+
+
+# The last frame pulled from BigQuery, kept so the next version only needs the
+# rows added since
+@st.cache_resource
+def _last_loaded():
+    return {}
+
+
+# Every page shares this one frame. The home page shows the full table, so the
+# superset of the pages' columns is simply every column. It is held once per
+# process (st.cache_data would keep a pickled copy and hand each caller its
+# own unpickled one) and frozen, since every session reads the same buffers.
+# Only the slice index below holds it, and hands out shallow copies.
+@st.cache_resource(max_entries=2)
+def _dataset(source, version):
+    if source == "snapshot":
+        return dtypes.freeze(dtypes.compact(snapshot.read_snapshot(config.snapshot_path())))
+
+    last_loaded = _last_loaded()
+    data = dtypes.freeze(refresh_from_bigquery(last_loaded.get(source)))
+    last_loaded[source] = data
+    return data
+
+
+# Built once per data version and shared by every session
+@st.cache_resource(max_entries=2)
+def _slice_index(source, version):
+    return slices.SliceIndex(_dataset(source, version))
+
+
+# One parameterized push-down query, cached by its text and parameters per
+# data version and shared like the full frame
+@st.cache_resource(max_entries=256, show_spinner=False)
+def _query_result(version, query, parameters):
+    client = get_bigquery_client()
+    with bigquery_pool().timed("push-down"):
+        return dtypes.freeze(dtypes.compact(download.query_to_dataframe(client, query, download.job_config(parameters))))
+
+
+def run_query(version, query, parameters):
+    return _query_result(version, query, parameters).copy(deep=False)
+
+
+# The rows every loader below draws from: the in-memory index of the whole
+# table, or in push-down mode the same interface answered by BigQuery
+def _index(source, version):
+    if source == "bigquery" and config.pushdown():
+        return pushdown.PushdownSlices(TABLE, functools.partial(run_query, version))
+    return _slice_index(source, version)
+
+
+@profiling.profiled
+def load_slices(columns=None):
+    source = config.data_source()
+    index = _index(source, data_version(source))
+    if columns is None:
+        return index
+    return index.project(columns)
+
+
+@st.cache_resource(max_entries=32)
+def _cube(source, version, groups):
+    return cube.Cube(_index(source, version).select(Group=list(groups)))
+
+
+# Dense indicator x subgroup x period values of the given Group(s)
+@profiling.profiled
+def load_cube(*groups):
+    source = config.data_source()
+    return _cube(source, data_version(source), groups)
+
+
+@st.cache_resource(max_entries=64)
+def _hierarchy(source, version, path, color, criteria):
+    return dtypes.freeze(hierarchy.nodes(_index(source, version).select(**dict(criteria)), path, color=color))
+
+
+# Sunburst/treemap nodes of the rows matching `criteria` (single values), built
+# once per data version
+@profiling.profiled
+def load_hierarchy(path, color=None, **criteria):
+    source = config.data_source()
+    return _hierarchy(source, data_version(source), tuple(path), color, tuple(criteria.items()))
+
+
+@st.cache_resource(max_entries=2)
+def _summaries(source, version):
+    index = _index(source, version)
+    if isinstance(index, pushdown.PushdownSlices):
+        return pushdown.PushdownSummaries(index)
+    return summaries.Summaries(index.data)
+
+
+# Precomputed means for the overview charts
+@profiling.profiled
+def load_summaries():
+    source = config.data_source()
+    return _summaries(source, data_version(source))
@@ -0,0 +1,62 @@
+import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+
+# BigQuery needs the parameter type spelled out, so take it from whatever
+# type the value (usually read back from a column) has
+def query_parameter(name, value):
+    from google.cloud import bigquery
+
+    if isinstance(value, pd.Timestamp):
+        value = value.to_pydatetime()
+    if isinstance(value, datetime.datetime):
+        return bigquery.ScalarQueryParameter(name, "DATETIME", value)
+    if isinstance(value, datetime.date):
+        return bigquery.ScalarQueryParameter(name, "DATE", value)
+    return bigquery.ScalarQueryParameter(name, "STRING", str(value))
+
+
+# Job config for a query with @name parameters, given as (name, value) pairs
+def job_config(parameters):
+    from google.cloud import bigquery
+
+    return bigquery.QueryJobConfig(query_parameters=[query_parameter(name, value) for name, value in parameters])
+
+
+# Query results as an Arrow table. Record batches are streamed over the
+# BigQuery Storage Read API when google-cloud-bigquery-storage is installed
+# (the client pages JSON rows over REST by itself when it isn't), and the
+# query is read again over REST if the credentials may not open read
+# sessions.
+def query_to_arrow(client, query, job_config=None):
+    from google.api_core import exceptions
+
+    job = client.query(query, job_config=job_config)
+    try:
+        return job.result().to_arrow(create_bqstorage_client=True)
+    except (exceptions.PermissionDenied, exceptions.Forbidden):
+        return job.result().to_arrow(create_bqstorage_client=False)
+
+
+# A DataFrame built from the Arrow buffers directly: numbers are converted a
+# column at a time while Arrow frees what's been converted, strings arrive as
+# categoricals (as dtypes.compact() stores them) and dates as db-dtypes
+# dates. The table can't be used afterwards.
+def arrow_to_dataframe(table):
+    import db_dtypes
+
+    data = table.to_pandas(strings_to_categorical=True, split_blocks=True, self_destruct=True,
+                           types_mapper={pa.date32(): db_dtypes.DateDtype()}.get)
+    # Arrow orders categories by first appearance; sort them the way
+    # astype('category') does, so groupbys and charts come out the same
+    # whichever way the data was loaded
+    for name, column in data.items():
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            data[name] = column.cat.reorder_categories(sorted(column.cat.categories))
+    return data
+
+
+def query_to_dataframe(client, query, job_config=None):
+    return arrow_to_dataframe(query_to_arrow(client, query, job_config))
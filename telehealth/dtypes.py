@@ -0,0 +1,60 @@
+import db_dtypes  # noqa: F401  (registers the dbdate dtype)
+import numpy as np
+import pandas as pd
+
+# Low-cardinality labels repeated on every row of the long-format table
+CATEGORY_COLUMNS = ["Indicator", "Group", "State", "Subgroup", "Phase", "Code",
+                    "Time_Period_Label", "Quartile_Range", "Suppression_Flag"]
+FLOAT_COLUMNS = ["Value", "LowCI", "HighCI"]
+DATE_COLUMNS = ["Time_Period_Start_Date", "Time_Period_End_Date"]
+
+
+# Shrink the table to categoricals, float32 and 8-byte dates. Columns that are
+# missing or already compact are left alone, so it is safe to call on frames
+# from any source.
+def compact(data):
+    data = data.copy(deep=False)
+    for column in CATEGORY_COLUMNS:
+        if column in data and data[column].dtype == object:
+            data[column] = data[column].astype("category")
+    for column in FLOAT_COLUMNS:
+        if column in data and data[column].dtype == "float64":
+            data[column] = data[column].astype("float32")
+    if "Time_Period" in data and pd.api.types.is_integer_dtype(data["Time_Period"]):
+        data["Time_Period"] = pd.to_numeric(data["Time_Period"], downcast="integer")
+    for column in DATE_COLUMNS:
+        if column in data and data[column].dtype == object:
+            # dbdate (from db-dtypes, the type BigQuery DATE columns load as)
+            # stores datetime64 underneath but still hands out datetime.date
+            # values, so widgets and tables show the same labels as before
+            try:
+                data[column] = data[column].astype("dbdate")
+            except (TypeError, ValueError):
+                pass
+    return data
+
+
+# Marks the frame's buffers read-only, for frames shared by every session:
+# writing into one in place (df.loc[...] = x, or the same through a shallow
+# copy) then raises instead of changing the data for everyone. Reassigning
+# columns or sorting in place on a shallow copy only changes that copy.
+def freeze(data):
+    for array in data._mgr.arrays:
+        # Categorical codes and date arrays keep their numpy buffer in _ndarray
+        array = getattr(array, "_ndarray", array)
+        if isinstance(array, np.ndarray):
+            array.flags.writeable = False
+    return data
+
+
+def memory_report(before, after):
+    before_bytes = before.memory_usage(deep=True)
+    after_bytes = after.memory_usage(deep=True)
+    report = pd.DataFrame({
+        "before_dtype": before.dtypes.astype(str),
+        "after_dtype": after.dtypes.astype(str),
+        "before_MB": before_bytes.drop("Index") / 2**20,
+        "after_MB": after_bytes.drop("Index") / 2**20,
+    })
+    report.loc["Total"] = ["", "", before_bytes.sum() / 2**20, after_bytes.sum() / 2**20]
+    return report
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# Prophet's default interval_width is 80%
+INTERVAL_Z = 1.2815515655446004
+
+
+# Future dates the same way Prophet's make_future_dataframe picks them
+def future_dates(series, periods, freq):
+    last = series["ds"].max()
+    dates = pd.date_range(start=last, periods=periods + 1, freq=freq)
+    return dates[dates > last][:periods]
+
+
+# Forecasting engines take a list of ds/y series and the future dates to
+# predict for each, and return one entry per series: {"model": ...,
+# "forecast": frame with ds/yhat/yhat_lower/yhat_upper over the history and
+# the future dates}, or None when the series can't be fit.
+class ProphetEngine:
+    name = "prophet"
+    label = "Prophet"
+
+    def forecast_many(self, series_list, futures):
+        return [self._forecast(series, future) for series, future in zip(series_list, futures)]
+
+    def _forecast(self, series, future):
+        from prophet import Prophet
+        from prophet.serialize import model_to_json
+
+        # Create and fit the model
+        model = Prophet()
+        try:
+            model.fit(series)
+        except (ValueError, RuntimeError):
+            # Fewer than two non-NaN values, or Stan failed to converge
+            return None
+
+        # Make predictions over the history and the future dates
+        dates = pd.DataFrame({"ds": pd.concat([series["ds"], pd.Series(future)], ignore_index=True)})
+        forecast = model.predict(dates)
+        return {"model": model_to_json(model), "forecast": forecast}
+
+
+# Damped-trend Holt exponential smoothing, fit to many series at once. Every
+# series is fit against a small grid of smoothing parameters in one pass over
+# time, with all series and parameter sets as NumPy array dimensions, and keeps
+# the parameters with the smallest one-step-ahead squared error.
+class FastEngine:
+    name = "fast"
+    label = "Fast (Holt-Winters)"
+
+    alphas = np.linspace(0.05, 0.95, 10)
+    betas = np.array([0.0, 0.05, 0.15, 0.3])
+    phis = np.array([0.8, 0.9, 0.98])
+
+    def forecast_many(self, series_list, futures):
+        entries = [None] * len(series_list)
+        fit = [i for i, series in enumerate(series_list) if series["y"].notna().sum() >= 2]
+        if not fit:
+            return entries
+
+        # Series of different lengths are aligned on their last observation
+        length = max(len(series_list[i]) for i in fit)
+        y = np.full((len(fit), length), np.nan)
+        for row, i in enumerate(fit):
+            values = series_list[i]["y"].to_numpy(dtype=float)
+            y[row, length - len(values):] = values
+
+        alpha, beta, phi = (grid.ravel() for grid in np.meshgrid(self.alphas, self.betas, self.phis, indexing="ij"))
+        level, trend, fitted, sse, count = self._smooth(y, alpha, beta, phi)
+
+        best = np.argmin(sse, axis=1)
+        rows = np.arange(len(fit))
+        sigma = np.sqrt(sse[rows, best] / np.maximum(count - 1, 1))
+
+        for row, i in enumerate(fit):
+            series, future, b = series_list[i], futures[i], best[row]
+            a, be, ph = alpha[b], beta[b], phi[b]
+
+            # Horizon in observation steps, so irregularly spaced periods and a
+            # weekly future grid line up
+            ds = series["ds"]
+            step = ds.diff().median() if len(ds) > 1 else pd.Timedelta(days=7)
+            h = np.asarray((future - ds.iloc[-1]) / step, dtype=float)
+
+            damped = ph * (1 - ph ** h) / (1 - ph)
+            yhat_future = level[row, b] + damped * trend[row, b]
+            # ETS(A,Ad,N) forecast variance
+            j = np.arange(1, int(np.ceil(h.max())) + 1 if len(h) else 1)
+            c = a * (1 + be * ph * (1 - ph ** j) / (1 - ph))
+            spread = np.sqrt(1 + np.concatenate([[0.0], np.cumsum(c ** 2)])[np.maximum(np.ceil(h).astype(int) - 1, 0)])
+            yhat_history = fitted[row, b, length - len(series):]
+
+            yhat = np.concatenate([yhat_history, yhat_future])
+            width = INTERVAL_Z * sigma[row] * np.concatenate([np.ones(len(series)), spread])
+            forecast = pd.DataFrame({
+                "ds": pd.concat([ds, pd.Series(future)], ignore_index=True),
+                "yhat": yhat,
+                "yhat_lower": yhat - width,
+                "yhat_upper": yhat + width,
+            })
+            entries[i] = {"model": {"alpha": a, "beta": be, "phi": ph, "sigma": sigma[row]}, "forecast": forecast}
+        return entries
+
+    @staticmethod
+    def _smooth(y, alpha, beta, phi):
+        n_series, length = y.shape
+        # State per (series, parameter set), starting at each series' first value
+        first = y[np.arange(n_series), np.argmax(~np.isnan(y), axis=1)]
+        level = np.repeat(first[:, None], len(alpha), axis=1)
+        trend = np.zeros_like(level)
+        fitted = np.empty((n_series, len(alpha), length))
+        sse = np.zeros_like(level)
+        count = np.zeros(n_series)
+
+        for t in range(length):
+            prediction = level + phi * trend
+            fitted[:, :, t] = prediction
+            observed = ~np.isnan(y[:, t])
+            # Missing periods carry the prediction forward
+            error = np.where(observed[:, None], y[:, t, None] - prediction, 0.0)
+            sse += error ** 2
+            count += observed
+            level = prediction + alpha * error
+            trend = phi * trend + alpha * beta * error
+        return level, trend, fitted, sse, count
+
+
+ENGINES = {engine.name: engine for engine in (ProphetEngine(), FastEngine())}
@@ -0,0 +1,225 @@
+import argparse
+import hashlib
+import html
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import plotly.io as pio
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+
+from telehealth import headless
+
+WIDGETS = ["selectbox", "radio", "select_slider", "multiselect"]
+
+# Per fragment function, the widgets it created and whether it drew a chart.
+# Pages build their widgets and figures in the same functions, so they are
+# driven headlessly through streamlit.testing's AppTest (no server or
+# browser) and these hooks tell which widgets choose which charts. _drawn
+# holds the innermost fragment of each chart drawn, in page order.
+_fragments = {}
+_drawn = []
+
+
+def _entry(name):
+    return _fragments.setdefault(name, {"widgets": set(), "charts": False})
+
+
+def _record(name, seconds, widgets):
+    _entry(name)["widgets"] |= widgets
+
+
+# Charts are tracked on DeltaGenerator, which st.plotly_chart and
+# st.write(figure) both end up in
+def _init_worker():
+    headless.track_fragments(_record)
+    plotly_chart = DeltaGenerator.plotly_chart
+
+    def tracked_plotly_chart(self, *args, **kwargs):
+        for name in headless.running:
+            _entry(name)["charts"] = True
+        _drawn.append(headless.running[-1] if headless.running else None)
+        return plotly_chart(self, *args, **kwargs)
+
+    DeltaGenerator.plotly_chart = tracked_plotly_chart
+    st.plotly_chart = st.plotly_chart.__self__.plotly_chart
+
+
+def _run(page):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(headless.ROOT, page), default_timeout=3600).run()
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].value}")
+    return at
+
+
+def _widget(at, kind, label):
+    return next(widget for widget in at.get(kind) if widget.label == label)
+
+
+def _choose(at, kind, label, option):
+    widget = _widget(at, kind, label)
+    if kind == "selectbox":
+        widget.select_index(list(widget.options).index(option))
+    elif kind == "multiselect":
+        widget.set_value([option])
+    else:
+        widget.set_value(option)
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"{label} = {option}: {at.exception[0].value}")
+
+
+# A widget's current value as its options show it
+def _shown(widget):
+    values = widget.value if isinstance(widget.value, (list, tuple)) else [widget.value]
+    return ", ".join(str(widget.format_func(value)) for value in values)
+
+
+def _charts(at):
+    return [chart.proto.spec for chart in at.get("plotly_chart")]
+
+
+def _digest(spec):
+    return hashlib.sha1(spec.encode()).hexdigest()
+
+
+# The default run's charts, each with the default values of the widgets of
+# the fragment that drew it, and the widgets to sweep: one group per fragment
+# that draws charts, its widgets in page order, combined with each other but
+# not with other fragments' (which don't affect these charts)
+def discover(page):
+    _fragments.clear()
+    _drawn.clear()
+    at = _run(page)
+    widgets = [(kind, widget.label, widget.id) for kind in WIDGETS for widget in at.get(kind)]
+    groups, defaults = [], {}
+    for name, entry in _fragments.items():
+        group = [(kind, label) for kind, label, widget_id in widgets if widget_id in entry["widgets"]]
+        defaults[name] = [(label, _shown(_widget(at, kind, label))) for kind, label in group]
+        if entry["charts"] and group:
+            first_kind, first_label = group[0]
+            options = list(_widget(at, first_kind, first_label).options)
+            groups.append((group, options))
+    charts = [(defaults.get(name, []), spec) for name, spec in zip(_drawn, _charts(at))]
+    return page, charts, groups
+
+
+# Every combination in one group that starts with `first`, with the charts
+# that differ from the page's default
+def sweep(page, group, first):
+    at = _run(page)
+    default = {_digest(spec) for spec in _charts(at)}
+    results = []
+
+    def expand(remaining, selection):
+        if not remaining:
+            results.extend((selection, position, spec) for position, spec in enumerate(_charts(at))
+                           if _digest(spec) not in default)
+            return
+        (kind, label), rest = remaining[0], remaining[1:]
+        for option in list(_widget(at, kind, label).options):
+            _choose(at, kind, label, option)
+            expand(rest, selection + [(label, option)])
+
+    kind, label = group[0]
+    _choose(at, kind, label, first)
+    expand(group[1:], [(label, first)])
+    return page, results
+
+
+def _sweep(job):
+    return sweep(*job)
+
+
+# One chart to its own HTML page (sharing one plotly.js next to it) and,
+# with kaleido installed, a PNG
+def write_chart(job):
+    spec, directory, name, png = job
+    figure = pio.from_json(spec)
+    figure.write_html(os.path.join(directory, f"{name}.html"), include_plotlyjs="directory")
+    if png:
+        figure.write_image(os.path.join(directory, f"{name}.png"))
+    return name
+
+
+def _title(spec, position):
+    figure = pio.from_json(spec)
+    kind = figure.data[0].type if figure.data else "chart"
+    return f"{figure.layout.title.text} ({kind})" if figure.layout.title.text else f"Chart {position + 1} ({kind})"
+
+
+def write_index(directory, charts, png):
+    sections = []
+    for page, entries in itertools.groupby(charts, key=lambda chart: chart["page"]):
+        rows = []
+        for chart in entries:
+            selection = "; ".join(f"{label}: {value}" for label, value in chart["selection"]) or "No selection"
+            links = f'<a href="{chart["name"]}.html">HTML</a>'
+            if png:
+                links += f' <a href="{chart["name"]}.png">PNG</a>'
+            rows.append(f"<tr><td>{html.escape(chart['title'])}</td><td>{html.escape(selection)}</td>"
+                        f"<td>{links}</td></tr>")
+        sections.append(f"<h2>{html.escape(page)}</h2>\n<table>\n<tr><th>Chart</th><th>Selection</th><th></th></tr>\n"
+                        + "\n".join(rows) + "\n</table>")
+    with open(os.path.join(directory, "index.html"), "w") as index:
+        index.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Telehealth charts</title></head>\n"
+                    "<body>\n<h1>Telehealth charts</h1>\n" + "\n".join(sections) + "\n</body></html>\n")
+
+
+# Every chart of every page for every selection, found and rendered in
+# parallel across worker processes
+def run(page_list, directory, workers=None, png=False):
+    os.makedirs(directory, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        discovered = list(pool.map(discover, page_list))
+        jobs = [(page, group, first) for page, _, groups in discovered for group, options in groups
+                for first in options]
+        swept = list(pool.map(_sweep, jobs))
+
+        charts, seen = [], set()
+        for page, default, _ in discovered:
+            found = [(selection, position, spec) for position, (selection, spec) in enumerate(default)]
+            found += [result for swept_page, results in swept if swept_page == page for result in results]
+            stem = os.path.splitext(os.path.basename(page))[0]
+            for selection, position, spec in found:
+                digest = _digest(spec)
+                if digest in seen:
+                    continue
+                seen.add(digest)
+                charts.append({"page": page, "selection": selection, "spec": spec,
+                               "title": _title(spec, position), "name": f"{stem}-{len(charts) + 1}"})
+
+        list(pool.map(write_chart, [(chart["spec"], directory, chart["name"], png) for chart in charts]))
+    write_index(directory, charts, png)
+    return charts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m telehealth.export",
+                                     description="Render every chart for every selection to static files.")
+    parser.add_argument("--output", default="reports", help="Directory for the charts and index.html")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--png", action="store_true", help="Also write PNG images (needs kaleido)")
+    parser.add_argument("pages", nargs="*", help="Page scripts to export (default: all)")
+    args = parser.parse_args(argv)
+
+    if args.png:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("--png needs the kaleido package (pip install kaleido)")
+
+    start = time.perf_counter()
+    charts = run(args.pages or headless.pages(), args.output, args.workers, args.png)
+    print(f"Wrote {len(charts)} charts and {os.path.join(args.output, 'index.html')} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    # AppTest runs each page as __main__ in the workers, so hand them this
+    # module's functions under its importable name
+    from telehealth.export import main
+    main()
@@ -0,0 +1,133 @@
+import datetime
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import types
+
+import pandas as pd
+import pyarrow as pa
+
+from telehealth import snapshot
+
+TABLE = "4weekdataset.dataset"
+
+
+# A stand-in for bigquery.Client, backed by an in-memory SQLite copy of a
+# DataFrame, so the BigQuery code paths (incremental refresh, Arrow
+# download, fallbacks) can run offline. Queries are run as written: SQLite
+# accepts the `backticked` table name and @named parameters, FARM_FINGERPRINT
+# and BIT_XOR are added as functions, and only a whole-row
+# TO_JSON_STRING(alias) is rewritten, as a JSON array of the row's columns.
+# Results come back with the source frame's column types, like BigQuery's
+# schema would give them. With storage=False, Storage Read API requests are refused the
+# way BigQuery refuses them without the permission, to exercise the REST
+# fallback.
+class FakeClient:
+    def __init__(self, data, table=TABLE, storage=True, modified=None):
+        self.table = table
+        self.storage = storage
+        self.modified = modified or datetime.datetime.now(datetime.timezone.utc)
+        self.queries = []
+        self._lock = threading.Lock()
+        self._schema = _arrow_schema(data)
+        self._connection = sqlite3.connect(":memory:", check_same_thread=False)
+        self._connection.create_function("FARM_FINGERPRINT", 1, _fingerprint, deterministic=True)
+        self._connection.create_aggregate("BIT_XOR", 1, _BitXor)
+        _sql_rows(data).to_sql(table, self._connection, index=False)
+
+    @classmethod
+    def from_snapshot(cls, path, **kwargs):
+        modified = datetime.datetime.fromtimestamp(os.path.getmtime(path), datetime.timezone.utc)
+        return cls(snapshot.read_snapshot(path), modified=modified, **kwargs)
+
+    def get_table(self, table):
+        return types.SimpleNamespace(table_id=table, modified=self.modified)
+
+    def query(self, query, job_config=None):
+        parameters = {parameter.name: _sql_value(parameter.value)
+                      for parameter in getattr(job_config, "query_parameters", None) or []}
+        with self._lock:
+            self.queries.append(query)
+            rows = pd.read_sql_query(self._sqlite(query), self._connection, params=parameters)
+        return _FakeJob(_arrow_table(rows, self._schema), self.storage)
+
+    def _sqlite(self, query):
+        return re.sub(r"TO_JSON_STRING\((\w+)\)",
+                      lambda match: "json_array(" + ", ".join(f"{match[1]}.`{name}`" for name in self._schema.names) + ")",
+                      query)
+
+
+# A signed 64-bit hash of a string, standing in for BigQuery's FarmHash
+def _fingerprint(value):
+    return None if value is None else int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(),
+                                                     "big", signed=True)
+
+
+class _BitXor:
+    def __init__(self):
+        self.value = None
+
+    def step(self, value):
+        if value is not None:
+            self.value = value if self.value is None else self.value ^ value
+
+    def finalize(self):
+        return self.value
+
+
+class _FakeJob:
+    def __init__(self, table, storage):
+        self._table = table
+        self._storage = storage
+
+    def result(self):
+        return _FakeRows(self._table, self._storage)
+
+
+class _FakeRows:
+    def __init__(self, table, storage):
+        self._table = table
+        self._storage = storage
+
+    def to_arrow(self, progress_bar_type=None, bqstorage_client=None, create_bqstorage_client=True):
+        if (create_bqstorage_client or bqstorage_client) and not self._storage:
+            from google.api_core import exceptions
+            raise exceptions.PermissionDenied("bigquery.readsessions.create denied (fake)")
+        return self._table
+
+    def to_dataframe(self, **kwargs):
+        from telehealth.download import arrow_to_dataframe
+        return arrow_to_dataframe(self.to_arrow(create_bqstorage_client=False))
+
+
+# Column types as BigQuery would report them: plain strings, dates, floats
+def _arrow_schema(data):
+    fields = []
+    for field in pa.Schema.from_pandas(data, preserve_index=False):
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(field.type.value_type)
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _sql_rows(data):
+    return pd.DataFrame({name: column.map(_sql_value, na_action="ignore").astype(object)
+                         if not pd.api.types.is_numeric_dtype(column) else column
+                         for name, column in data.items()})
+
+
+def _sql_value(value):
+    if isinstance(value, (datetime.date, pd.Timestamp)):
+        return value.isoformat()
+    return value
+
+
+# SQLite hands back strings for dates; cast each column back to the source
+# type of the same name
+def _arrow_table(rows, schema):
+    table = pa.Table.from_pandas(rows, preserve_index=False)
+    fields = [schema.field(name) if name in schema.names else field
+              for name, field in zip(table.column_names, table.schema)]
+    return table.cast(pa.schema(fields))
@@ -0,0 +1,61 @@
+import collections
+import threading
+
+import plotly.io as pio
+import streamlit as st
+
+from telehealth import config, profiling
+from telehealth.data import current_version
+
+
+# Serialized figures, shared by every session and evicted least recently used
+# once their total size passes max_bytes
+class FigureCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._specs = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is None:
+                self.misses += 1
+                return None
+            self._specs.move_to_end(key)
+            self.hits += 1
+            return spec
+
+    def put(self, key, spec):
+        with self._lock:
+            if key in self._specs:
+                self.size -= len(self._specs.pop(key))
+            self._specs[key] = spec
+            self.size += len(spec)
+            while self.size > self.max_bytes and len(self._specs) > 1:
+                _, evicted = self._specs.popitem(last=False)
+                self.size -= len(evicted)
+        return spec
+
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(int(config.get_setting("figure_cache_mb", 64)) * 2**20)
+
+
+# build(data, *selection) for this selection and data version, rebuilt from
+# its JSON when any session has drawn it before. `data` must be the page's
+# dataset, which the data version stands in for in the key; the selection
+# must fully determine the figure.
+def cached_figure(build, data, *selection):
+    code = build.__code__
+    key = (code.co_filename, build.__qualname__, repr(selection), current_version())
+    cache = get_figure_cache()
+    spec = cache.get(key)
+    if spec is None:
+        figure = profiling.profiled(build)(data, *selection)
+        spec = cache.put(key, pio.to_json(figure, validate=False))
+    return pio.from_json(spec)
@@ -0,0 +1,182 @@
+import collections
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+import pandas as pd
+import streamlit as st
+
+from telehealth import config, snapshot
+from telehealth.engines import ENGINES, future_dates
+
+KEY_COLUMNS = ["Indicator", "Group", "Subgroup"]
+
+
+# Fitted models and their forecasts, kept in memory (LRU by entry count) and on
+# disk (LRU by total size), so a model is only refit when its input series or
+# settings change, and a restarted app starts warm.
+class ForecastCache:
+    def __init__(self, directory, max_bytes, max_entries):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                entry = pickle.load(f)
+            # Mark it recently used for the disk eviction below. Another
+            # thread may have evicted it since the load, which is a miss too.
+            os.utime(path)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        self._remember(key, entry)
+        return entry
+
+    def put(self, key, entry):
+        # Each write gets its own temporary file, so sessions finishing the
+        # same fit at once each swap in a complete file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self._remember(key, entry)
+        self._evict_files()
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_files(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+@st.cache_resource
+def get_forecast_cache():
+    return ForecastCache(config.get_setting("forecast_cache_dir", ".cache/forecasts"),
+                         max_bytes=int(config.get_setting("forecast_cache_mb", 256)) * 2**20,
+                         max_entries=int(config.get_setting("forecast_cache_entries", 64)))
+
+
+# The ds/y frame Prophet fits, from one series' rows of the dataset
+def forecast_series(rows):
+    series = pd.DataFrame({"ds": pd.to_datetime(rows["Time_Period_Start_Date"]),
+                           "y": rows["Value"].astype(float)})
+    return series.sort_values("ds").reset_index(drop=True)
+
+
+# Hash of the ds/y values, so any change in the underlying data means a refit
+def series_fingerprint(series):
+    hashes = pd.util.hash_pandas_object(series[["ds", "y"]], index=False)
+    return hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest()
+
+
+def forecast_key(engine, indicator, group, subgroup, periods, freq, series):
+    parts = [engine, indicator, group, subgroup, str(periods), freq, series_fingerprint(series)]
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
+
+def default_engine():
+    return config.get_setting("forecast_engine", "prophet")
+
+
+# Fit one series and predict `periods` steps of `freq` past its last date
+def fit_forecast(series, periods, freq, engine=None):
+    engine = ENGINES[engine or default_engine()]
+    return engine.forecast_many([series], [future_dates(series, periods, freq)])[0]
+
+
+# Forecast for one indicator/group/subgroup series with columns ds and y, or
+# None if the series is too short to fit
+def cached_forecast(series, indicator, group, subgroup, periods=12, freq="W", engine=None):
+    engine = engine or default_engine()
+    cache = get_forecast_cache()
+    key = forecast_key(engine, indicator, group, subgroup, periods, freq, series)
+    entry = cache.get(key)
+    if entry is None:
+        entry = fit_forecast(series, periods, freq, engine)
+        if entry is None:
+            return None
+        cache.put(key, entry)
+    return entry["forecast"]
+
+
+# Forecasts written by telehealth.batch_forecast, looked up by series
+class ForecastTable:
+    def __init__(self, table):
+        self.table = table
+        self._positions = table.groupby(KEY_COLUMNS, observed=True, sort=False).indices
+
+    def get(self, indicator, group, subgroup, series, periods, freq, engine):
+        positions = self._positions.get((indicator, group, subgroup))
+        if positions is None:
+            return None
+        forecast = self.table.iloc[positions]
+        # Stale if the series has changed since the batch ran
+        first = forecast.iloc[0]
+        if (first["fingerprint"] != series_fingerprint(series) or first["engine"] != engine
+                or first["periods"] != periods or first["freq"] != freq):
+            return None
+        return forecast.reset_index(drop=True)
+
+
+@st.cache_resource(max_entries=2)
+def _forecast_table(path, version):
+    return ForecastTable(snapshot.read_snapshot(path))
+
+
+def load_forecast_table():
+    path = config.get_setting("forecast_table_path", "data/forecasts.arrow")
+    if not os.path.exists(path):
+        return None
+    return _forecast_table(path, snapshot.snapshot_version(path))
+
+
+# Precomputed forecast when the batch job has one for this exact series,
+# otherwise fit (or reuse) one now
+def get_forecast(series, indicator, group, subgroup, periods=12, freq="W", engine=None):
+    engine = engine or default_engine()
+    table = load_forecast_table()
+    if table is not None:
+        forecast = table.get(indicator, group, subgroup, series, periods, freq, engine)
+        if forecast is not None:
+            return forecast
+    return cached_forecast(series, indicator, group, subgroup, periods, freq, engine)
@@ -0,0 +1,46 @@
+import functools
+import glob
+import os
+import time
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Fragments in progress, innermost last, while track_fragments is on
+running = []
+
+
+# The app's page scripts under `root`, home page first, as paths relative to it
+def pages(root=ROOT):
+    return ["streamlit_app.py"] + sorted(os.path.relpath(path, root) for path in glob.glob(os.path.join(root, "pages", "*.py")))
+
+
+# Wraps st.fragment, for pages run headlessly through streamlit.testing's
+# AppTest, so every fragment run calls `record(name, seconds, widget_ids)`
+# with the function's qualified name, its run time and the widgets it
+# created. Must be on before the pages define their fragments.
+def track_fragments(record):
+    fragment = st.fragment
+
+    def tracked_fragment(func=None, **kwargs):
+        if func is None:
+            return functools.partial(tracked_fragment, **kwargs)
+
+        @functools.wraps(func)
+        def tracked(*args, **func_kwargs):
+            widgets = get_script_run_ctx().shared.widget_ids_this_run
+            before = widgets.snapshot()
+            running.append(func.__qualname__)
+            start = time.perf_counter()
+            try:
+                return func(*args, **func_kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                running.pop()
+                record(func.__qualname__, seconds, widgets.snapshot() - before)
+
+        return fragment(tracked, **kwargs)
+
+    st.fragment = tracked_fragment
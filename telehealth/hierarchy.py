@@ -0,0 +1,33 @@
+import pandas as pd
+
+
+# Sunburst/treemap nodes for a path of columns, laid out the way Plotly
+# Express builds them: one node per distinct prefix of the path, id'd by the
+# prefix joined with "/", valued by the sum of `values` below it and, if
+# `color` is given, coloured by the values-weighted mean of that column.
+# Leaves come first, then each level above them. The result (columns ids,
+# labels, parents, values[, color]) goes straight into go.Sunburst or
+# go.Treemap with branchvalues='total'.
+def nodes(data, path, values="Value", color=None):
+    path = list(path)
+    rows = data[path].astype(str)
+    rows["values"] = data[values].to_numpy(dtype=float)
+    if color is not None:
+        rows["weighted"] = rows["values"] * data[color].to_numpy(dtype=float)
+
+    # Sum to the leaves once; every level above is summed from those
+    sums = [column for column in ("values", "weighted") if column in rows]
+    leaves = rows.groupby(path, sort=True)[sums].sum().reset_index()
+    levels = []
+    for depth in range(len(path), 0, -1):
+        columns = path[:depth]
+        level = leaves if depth == len(path) else leaves.groupby(columns, sort=True)[sums].sum().reset_index()
+        # Labels may contain "/" themselves, so parents are built up, not split off
+        ids, parents = level[columns[0]], pd.Series("", index=level.index)
+        for column in columns[1:]:
+            ids, parents = ids + "/" + level[column], ids
+        node = pd.DataFrame({"ids": ids, "labels": level[columns[-1]], "parents": parents, "values": level["values"]})
+        if color is not None:
+            node["color"] = level["weighted"] / level["values"]
+        levels.append(node)
+    return pd.concat(levels, ignore_index=True)
@@ -0,0 +1,68 @@
+import pandas as pd
+
+from telehealth import download
+
+WATERMARK_COLUMN = "Time_Period_End_Date"
+FINGERPRINT_ATTR = "history_fingerprint"
+
+
+def watermark(data):
+    if data is None or data.empty:
+        return None
+    return data[WATERMARK_COLUMN].max()
+
+
+def _run(client, query, mark):
+    return download.query_to_dataframe(client, query, download.job_config([("watermark", mark)]))
+
+
+# Row count and an order-independent checksum of every row up to the
+# watermark: each row's JSON is fingerprinted and the fingerprints XORed, so
+# any revision, deletion, backfill or relabelling of older periods changes
+# it. BigQuery reads the whole history for this but sends back one row.
+def remote_history_fingerprint(client, table, mark):
+    query = f"""
+    SELECT COUNT(*) AS row_count, BIT_XOR(FARM_FINGERPRINT(TO_JSON_STRING(t))) AS checksum
+    FROM `{table}` AS t
+    WHERE {WATERMARK_COLUMN} <= @watermark
+    """
+    row = _run(client, query, mark).iloc[0]
+    checksum = 0 if pd.isna(row["checksum"]) else int(row["checksum"])
+    return [int(row["row_count"]), checksum]
+
+
+# Records the fingerprint of the history `data` was loaded with in
+# data.attrs, which refresh() compares against and snapshots keep
+def stamp(client, table, data):
+    mark = watermark(data)
+    if mark is not None:
+        data.attrs[FINGERPRINT_ATTR] = remote_history_fingerprint(client, table, mark)
+    return data
+
+
+def fetch_since(client, table, mark):
+    query = f"""
+    SELECT *
+    FROM `{table}`
+    WHERE {WATERMARK_COLUMN} > @watermark
+    """
+    return _run(client, query, mark)
+
+
+# Bring a previously loaded frame up to date. Only rows newer than the
+# watermark are downloaded, unless the older history no longer matches the
+# fingerprint stamped on the frame (or it has none), in which case the whole
+# table is reloaded.
+def refresh(client, table, data, full_reload):
+    mark = watermark(data)
+    stored = data.attrs.get(FINGERPRINT_ATTR) if mark is not None else None
+    if stored is None or list(stored) != remote_history_fingerprint(client, table, mark):
+        return stamp(client, table, full_reload())
+
+    new_rows = fetch_since(client, table, mark)
+    if new_rows.empty:
+        return data
+    if set(new_rows.columns) != set(data.columns):
+        # The table's schema changed, so the old rows are stale too
+        return stamp(client, table, full_reload())
+    return stamp(client, table, pd.concat([data, new_rows[data.columns]], ignore_index=True))
@@ -0,0 +1,51 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+
+# Shorter display versions of the table's labels
+def short_indicator(label):
+    # Every indicator name ends with the same reference period
+    return label.replace(', Last 4 Weeks', '')
+
+
+def short_subgroup(label):
+    return label.replace('Non-Hispanic', '').replace(', o', 'O')
+
+
+def truncated(label, length):
+    return label[:length]
+
+
+# The renamed labels, de-duplicated in order of first appearance, and where
+# each original label went. Category sets only change with the data version,
+# so this runs once per version rather than on every rerun.
+@functools.lru_cache(maxsize=256)
+def _mapping(labels, rename, args):
+    renamed = pd.Index([rename(label, *args) for label in labels])
+    unique = renamed.unique()
+    return unique, unique.get_indexer(renamed)
+
+
+# rename(label, *args) applied to each distinct label of a Series or Index
+# rather than to each row: categoricals only have their codes remapped, other
+# values are factorized first. Labels that collide after renaming (two
+# indicators truncated to the same prefix) become one, as they did with
+# .apply. Returns the same kind of object it was given, with NaN kept.
+def relabel(values, rename, *args):
+    categorical = isinstance(values.dtype, pd.CategoricalDtype)
+    if categorical:
+        codes = np.asarray(values.cat.codes if isinstance(values, pd.Series) else values.codes)
+        categories = values.cat.categories if isinstance(values, pd.Series) else values.categories
+    else:
+        codes, categories = pd.factorize(values)
+    unique, code_map = _mapping(tuple(categories), rename, args)
+    # Missing values (code -1) pick up the -1 appended at the end
+    codes = np.append(code_map, -1)[codes]
+    result = pd.Categorical.from_codes(codes, categories=unique)
+    if not categorical:
+        result = np.asarray(result, dtype=object)
+    if isinstance(values, pd.Index):
+        return pd.Index(result, name=values.name)
+    return pd.Series(result, index=values.index, name=values.name)
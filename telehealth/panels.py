@@ -0,0 +1,39 @@
+import pandas as pd
+import streamlit as st
+
+from telehealth import config, profiling
+from telehealth.data import bigquery_pool
+
+
+# Sidebar view of the shared BigQuery client: how often it was reused rather
+# than rebuilt, and how long each kind of query has been taking. Opt-in with
+# the show_metrics setting, and only meaningful with the BigQuery source.
+def connection_metrics():
+    if not config.show_metrics() or config.data_source() != "bigquery":
+        return
+    counts, latency = bigquery_pool().metrics()
+    with st.sidebar.expander("BigQuery connection"):
+        st.dataframe(pd.Series(counts, name="count"))
+        if latency:
+            st.dataframe(pd.DataFrame(latency).T.round(3))
+        else:
+            st.caption("No queries yet")
+
+
+# Sidebar table of the latest call of each profiled load and plot function in
+# this session, nested calls indented under their caller, with the session's
+# records downloadable as JSON lines. Opt-in with the profile setting.
+def profiling_panel():
+    if not profiling.enabled():
+        return
+    with st.sidebar.expander("Profile"):
+        records = profiling.latest()
+        if not records:
+            st.caption("Nothing profiled yet")
+            return
+        table = pd.DataFrame(records)
+        table.index = ["\u2003" * depth + name for depth, name in zip(table["depth"], table["function"])]
+        st.dataframe(table[["seconds", "peak_alloc_KB", "net_alloc_KB", "payload_KB"]])
+        st.caption("Fragment reruns update their own rows on the next full rerun")
+        st.download_button("Download records", profiling.export(), file_name="profile.jsonl",
+                           mime="application/x-ndjson")
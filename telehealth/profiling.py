@@ -0,0 +1,132 @@
+import collections
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+import plotly.io as pio
+import streamlit as st
+from streamlit.delta_generator import DeltaGenerator
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from telehealth import config
+
+logger = logging.getLogger("telehealth.profile")
+
+# Calls in progress on each script thread, innermost last, so nested calls
+# (a loader inside a plot function) don't lose the outer call's peak memory
+_local = threading.local()
+_installed = False
+_install_lock = threading.Lock()
+
+
+def enabled():
+    return str(config.get_setting("profile", "false")).lower() in ("1", "true", "yes")
+
+
+# Turned on once per process: tracemalloc, the structured log and the chart
+# payload counter. tracemalloc slows every allocation and counts the whole
+# process, so profiling is opt-in and its numbers are best read with one
+# visitor at a time. Sessions starting together can get here at once, so
+# the check is made under a lock.
+def _install():
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        _installed = True
+        _setup()
+
+
+def _setup():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    # One JSON object per line, to a file if profile_log is set, else stderr
+    path = config.get_setting("profile_log")
+    handler = logging.FileHandler(path) if path else logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    # Figures are serialized again to count the bytes each call sends. The
+    # hook is on DeltaGenerator, which st.plotly_chart and st.write(figure)
+    # both end up in.
+    plotly_chart = DeltaGenerator.plotly_chart
+
+    @functools.wraps(plotly_chart)
+    def measured_plotly_chart(self, figure_or_data, *args, **kwargs):
+        size = len(pio.to_json(figure_or_data, validate=False))
+        for frame in getattr(_local, "stack", []):
+            frame["payload"] += size
+        return plotly_chart(self, figure_or_data, *args, **kwargs)
+
+    DeltaGenerator.plotly_chart = measured_plotly_chart
+    st.plotly_chart = st.plotly_chart.__self__.plotly_chart
+
+
+def _records():
+    return st.session_state.setdefault("_profile_records", collections.deque(maxlen=1000))
+
+
+# Records wall time, peak and net allocations, and the bytes of chart JSON
+# sent, for every call of `func`, to this session's records and the log.
+# Returns `func` untouched unless the profile setting is on.
+def profiled(func):
+    if not enabled():
+        return func
+    _install()
+    name = f"{os.path.basename(func.__code__.co_filename)}:{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = _local.__dict__.setdefault("stack", [])
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        tracemalloc.reset_peak()
+        frame = {"start": current, "peak": current, "payload": 0}
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory()
+            frame["peak"] = max(frame["peak"], peak)
+            stack.pop()
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+            ctx = get_script_run_ctx()
+            record = {
+                "time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds"),
+                "session": ctx.session_id if ctx else None,
+                "function": name,
+                "depth": len(stack),
+                "seconds": round(seconds, 4),
+                "peak_alloc_KB": round((frame["peak"] - frame["start"]) / 2**10, 1),
+                "net_alloc_KB": round((current - frame["start"]) / 2**10, 1),
+                "payload_KB": round(frame["payload"] / 2**10, 1),
+            }
+            logger.info(json.dumps(record))
+            if ctx:
+                _records().append(record)
+
+    return wrapper
+
+
+# The latest call of each profiled function in this session: a full rerun
+# refreshes all of them, a fragment rerun only its own
+def latest():
+    records = list(_records())
+    newest = {record["function"]: record for record in records}
+    return [record for record in records if newest[record["function"]] is record]
+
+
+def export():
+    return "".join(json.dumps(record) + "\n" for record in _records())
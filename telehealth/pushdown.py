@@ -0,0 +1,94 @@
+import copy
+
+from telehealth import hierarchy
+
+# Default row order for paging, which needs one that is stable between queries
+PAGE_ORDER = ["Time_Period_End_Date", "Indicator", "Group", "Subgroup", "State"]
+
+
+# WHERE clause and its (name, value) parameters for criteria like
+# Group='By Age' or Subgroup=['Male', 'Female']. Values only ever travel as
+# parameters, never as SQL text.
+def where(criteria):
+    clauses, parameters = [], []
+    for column, value in criteria.items():
+        values = list(value) if isinstance(value, (list, tuple)) else [value]
+        names = [f"p{len(parameters) + i}" for i in range(len(values))]
+        parameters.extend(zip(names, values))
+        if names:
+            clauses.append(f"`{column}` IN ({', '.join('@' + name for name in names)})")
+        else:
+            clauses.append("1 = 0")
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", tuple(parameters)
+
+
+def _select_list(columns):
+    return ", ".join(f"`{column}`" for column in columns) if columns else "*"
+
+
+# The SliceIndex interface (project/select/unique), answered by the database:
+# each call becomes one parameterized query over just the selected rows and
+# columns, so a page never downloads the whole table. `run(query, parameters)`
+# executes and caches them.
+class PushdownSlices:
+    def __init__(self, table, run):
+        self.table = table
+        self.columns = None
+        self._run = run
+
+    def project(self, columns):
+        view = copy.copy(self)
+        view.columns = list(columns)
+        return view
+
+    def query(self, select, criteria, suffix=""):
+        clause, parameters = where(criteria)
+        return self._run(f"SELECT {select} FROM `{self.table}`{clause}{suffix}", parameters)
+
+    def select(self, columns=None, **criteria):
+        return self.query(_select_list(columns or self.columns), criteria)
+
+    # Distinct values, sorted (the database keeps no row order to go by)
+    def unique(self, column, **criteria):
+        return list(self.query(f"DISTINCT `{column}`", criteria, f" ORDER BY `{column}`")[column])
+
+    # Mean Value of each `by` combination, sorted by it
+    def means(self, by, **criteria):
+        by = _select_list(by)
+        return self.query(f"{by}, AVG(`Value`) AS `Value`", criteria, f" GROUP BY {by} ORDER BY {by}")
+
+    def column_names(self):
+        return list(self.query(_select_list(self.columns), {}, " LIMIT 0").columns)
+
+    def count(self, **criteria):
+        return int(self.query("COUNT(*) AS `rows`", criteria)["rows"].iloc[0])
+
+    # One page of rows, sorted by `sort_by` and then PAGE_ORDER. The
+    # tie-breakers keep rows with equal `sort_by` values in one order from
+    # query to query, so pages don't repeat or skip rows.
+    def page(self, start, size, sort_by=None, ascending=True, **criteria):
+        direction = "ASC" if ascending else "DESC"
+        columns = [sort_by] + [column for column in PAGE_ORDER if column != sort_by] if sort_by else PAGE_ORDER
+        order = ", ".join(f"`{column}` {direction} NULLS LAST" for column in columns)
+        return self.query(_select_list(self.columns), criteria,
+                          f" ORDER BY {order} LIMIT {int(size)} OFFSET {int(start)}")
+
+
+# Summaries' lookups as GROUP BY queries per selection
+class PushdownSummaries:
+    def __init__(self, slices):
+        self._slices = slices
+        self._treemap = None
+
+    @property
+    def treemap(self):
+        if self._treemap is None:
+            path = ["Indicator", "Group", "Subgroup", "State"]
+            self._treemap = hierarchy.nodes(self._slices.means(path), path, color="Value")
+        return self._treemap
+
+    def subgroup_means(self, group, indicator):
+        return self._slices.means(["Indicator", "Subgroup"], Group=group, Indicator=indicator)
+
+    def state_means(self, by, indicator):
+        return self._slices.means([by], Group="By State", Indicator=indicator)
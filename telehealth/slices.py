@@ -0,0 +1,88 @@
+import copy
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Filters the pages apply on every rerun. Other combinations of columns are
+# indexed the first time they are asked for.
+PREBUILT = [
+    ("Group",),
+    ("Subgroup",),
+    ("Group", "Indicator"),
+    ("Group", "Subgroup"),
+    ("Subgroup", "Indicator"),
+    ("Group", "Indicator", "Subgroup"),
+]
+
+
+# Row positions of every (column values...) key, so a filter like
+# Group == 'By Age' & Indicator == x is a dict lookup plus an O(slice) take
+# instead of a boolean mask over the whole table. Positions are kept in the
+# table's own order, so slices and their unique() values come out in the
+# same order as with masking. The index is shared by every session, so the
+# table itself stays private: callers get shallow copies, and sorting one in
+# place or assigning its columns can't reorder the rows the positions refer to.
+class SliceIndex:
+    def __init__(self, data):
+        self._data = data
+        self.columns = None
+        self._positions = {}
+        self._lock = threading.Lock()
+        for columns in PREBUILT:
+            if all(column in data for column in columns):
+                self._groups(columns)
+
+    # Its own DataFrame object over the shared (read-only) buffers
+    @property
+    def data(self):
+        return self._data.copy(deep=False)
+
+    def _groups(self, columns):
+        # Keys are stored in the table's column order, whatever order the
+        # criteria were passed in
+        columns = tuple(sorted(columns, key=self._data.columns.get_loc))
+        groups = self._positions.get(columns)
+        if groups is None:
+            with self._lock:
+                groups = self._data.groupby(list(columns), observed=True, sort=False).indices
+                if len(columns) == 1:
+                    groups = {(key,): positions for key, positions in groups.items()}
+                self._positions[columns] = groups
+        return columns, groups
+
+    # The same index restricted to some columns, for pages that only need a few
+    def project(self, columns):
+        view = copy.copy(self)
+        view.columns = list(columns)
+        return view
+
+    def positions(self, **criteria):
+        if not criteria:
+            return np.arange(len(self._data))
+        columns, groups = self._groups(criteria)
+
+        # A list of values behaves like isin()
+        choices = [criteria[column] if isinstance(criteria[column], (list, tuple, set, np.ndarray, pd.Index))
+                   else [criteria[column]] for column in columns]
+        found = [groups[key] for key in itertools.product(*choices) if key in groups]
+        if not found:
+            return np.array([], dtype=np.intp)
+        if len(found) == 1:
+            return found[0]
+        return np.sort(np.concatenate(found))
+
+    def select(self, columns=None, **criteria):
+        rows = self.positions(**criteria)
+        columns = columns or self.columns
+        if columns is None:
+            return self._data.iloc[rows]
+        return self._data.iloc[rows, self._data.columns.get_indexer(list(columns))]
+
+    # Distinct values of a column within a slice, in order of first appearance
+    def unique(self, column, **criteria):
+        if not criteria:
+            _, groups = self._groups([column])
+            return [key[0] for key, _ in sorted(groups.items(), key=lambda item: item[1][0])]
+        return list(self.select([column], **criteria)[column].unique())
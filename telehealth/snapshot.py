@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+
+import db_dtypes  # noqa: F401  (registers the dbdate dtype compacted snapshots are saved with)
+import pyarrow as pa
+
+from telehealth import config
+
+# Schema metadata key holding the frame's attrs (e.g. the history fingerprint
+# incremental refreshes compare against), which Arrow doesn't carry itself
+ATTRS_KEY = b"telehealth.attrs"
+
+
+# Snapshots are written as uncompressed Arrow IPC files so they can be
+# memory-mapped and read without decoding. Parquet is accepted too for
+# snapshots exported elsewhere, but it has to be decoded on every read.
+def write_snapshot(data, path):
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    if data.attrs:
+        table = table.replace_schema_metadata({**table.schema.metadata, ATTRS_KEY: json.dumps(data.attrs)})
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    # Write next to the target and swap it in, so a running app never sees a
+    # half-written file
+    tmp_path = f"{path}.tmp"
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp_path)
+    else:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot_table(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        return pq.read_table(path, memory_map=True)
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def read_snapshot(path):
+    table = read_snapshot_table(path)
+    data = table.to_pandas()
+    attrs = (table.schema.metadata or {}).get(ATTRS_KEY)
+    if attrs:
+        data.attrs.update(json.loads(attrs))
+    return data
+
+
+def snapshot_version(path):
+    stat = os.stat(path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+# Snapshots are updated incrementally by default: only periods newer than the
+# snapshot's latest Time_Period_End_Date are downloaded and appended
+def refresh(path, credentials_file=None, full=False):
+    from telehealth.data import get_bigquery_client, refresh_from_bigquery
+
+    if credentials_file:
+        from google.cloud import bigquery
+        client = bigquery.Client.from_service_account_json(credentials_file)
+    else:
+        client = get_bigquery_client()
+
+    if full or not os.path.exists(path):
+        data = refresh_from_bigquery(None, client)
+    else:
+        data = refresh_from_bigquery(read_snapshot(path), client)
+    write_snapshot(data, path)
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m telehealth.snapshot",
+                                     description="Manage the local snapshot of the BigQuery dataset.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    refresh_parser = subparsers.add_parser("refresh", help="Download the table from BigQuery into the snapshot file")
+    refresh_parser.add_argument("--path", default=config.snapshot_path(),
+                                help="Snapshot file (.arrow for memory-mapped reads, or .parquet)")
+    refresh_parser.add_argument("--credentials",
+                                help="Service account JSON file, instead of st.secrets['gcp_service_account']")
+    refresh_parser.add_argument("--full", action="store_true",
+                                help="Re-download the whole table instead of only the new periods")
+
+    args = parser.parse_args(argv)
+    if args.command == "refresh":
+        data = refresh(args.path, args.credentials, args.full)
+        print(f"Wrote {len(data)} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
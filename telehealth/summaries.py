@@ -0,0 +1,45 @@
+import pandas as pd
+
+from telehealth import hierarchy
+
+
+# Split a table into {key tuple: rows} on the given columns, dropping them
+# (or just the `drop` columns) from the rows
+def _split(table, columns, drop=None):
+    return {key: rows.drop(columns=drop or columns).reset_index(drop=True)
+            for key, rows in table.groupby(columns, observed=True, sort=False)}
+
+
+# Mean values the overview charts need, computed once per data version. Each
+# chart then looks up its small table by the current selection instead of
+# grouping the whole dataset on every rerun.
+class Summaries:
+    def __init__(self, data):
+        # Treemap nodes of every Indicator > Group > Subgroup > State, sized
+        # and coloured by their mean values
+        path = ["Indicator", "Group", "Subgroup", "State"]
+        self.treemap = hierarchy.nodes(data.groupby(path, observed=True)["Value"].mean().reset_index(),
+                                       path, color="Value")
+
+        # Per-subgroup means of every Group and Indicator (donut charts)
+        self._subgroup_means = _split(
+            data.groupby(["Group", "Indicator", "Subgroup"], observed=True)["Value"].mean().reset_index(),
+            ["Group", "Indicator"], drop=["Group"])
+
+        # Per-state means of every Indicator, keyed by state code (maps) and
+        # by state name (rankings)
+        states = data[data["Group"] == "By State"]
+        self._state_means = {
+            column: _split(states.groupby(["Indicator", column], observed=True)["Value"].mean().reset_index(),
+                           ["Indicator"])
+            for column in ("Code", "State") if column in data
+        }
+
+    # Columns Indicator, Subgroup, Value
+    def subgroup_means(self, group, indicator):
+        empty = pd.DataFrame(columns=["Indicator", "Subgroup", "Value"])
+        return self._subgroup_means.get((group, indicator), empty)
+
+    # Columns `by` (Code or State) and Value
+    def state_means(self, by, indicator):
+        return self._state_means[by].get((indicator,), pd.DataFrame(columns=[by, "Value"]))
@@ -0,0 +1,133 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from telehealth import dtypes, snapshot
+
+INDICATORS = [
+    "Took Prescription Medication for Mental Health, Last 4 Weeks",
+    "Received Counseling or Therapy, Last 4 Weeks",
+    "Took Prescription Medication for Mental Health And/Or Received Counseling or Therapy, Last 4 Weeks",
+    "Needed Counseling or Therapy But Did Not Get It, Last 4 Weeks",
+    "Adults Who Had an Appointment with a Health Professional Over Video or Phone, Last 4 Weeks",
+    "Households With Children Where Any Child Had an Appointment with a Health Professional Over Video or Phone, Last 4 Weeks",
+]
+
+SUBGROUPS = {
+    "National Estimate": ["United States"],
+    "By Age": ["18 - 29 years", "30 - 39 years", "40 - 49 years", "50 - 59 years", "60 - 69 years",
+               "70 - 79 years", "80 years and above"],
+    "By Sex": ["Male", "Female"],
+    "By Race/Hispanic ethnicity": ["Hispanic or Latino", "Non-Hispanic White, single race",
+                                   "Non-Hispanic Black, single race", "Non-Hispanic Asian, single race",
+                                   "Non-Hispanic, other races and multiple races"],
+    "By Education": ["Less than a high school diploma", "High school diploma or GED",
+                     "Some college/Associate's degree", "Bachelor's degree or higher"],
+    "By Disability status": ["With disability", "Without disability"],
+    "By Presence of Symptoms of Anxiety/Depression": [
+        "Experienced symptoms of anxiety/depression in past 4 weeks",
+        "Did not experience symptoms of anxiety/depression in the past 4 weeks"],
+    "By Gender identity": ["Cis-gender male", "Cis-gender female", "Transgender"],
+    "By Sexual orientation": ["Gay or lesbian", "Straight", "Bisexual"],
+}
+
+STATES = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA", "Colorado": "CO",
+    "Connecticut": "CT", "Delaware": "DE", "District of Columbia": "DC", "Florida": "FL", "Georgia": "GA",
+    "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA", "Kansas": "KS",
+    "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD", "Massachusetts": "MA",
+    "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS", "Missouri": "MO", "Montana": "MT",
+    "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH", "New Jersey": "NJ", "New Mexico": "NM",
+    "New York": "NY", "North Carolina": "NC", "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK",
+    "Oregon": "OR", "Pennsylvania": "PA", "Rhode Island": "RI", "South Carolina": "SC", "South Dakota": "SD",
+    "Tennessee": "TN", "Texas": "TX", "Utah": "UT", "Vermont": "VT", "Virginia": "VA", "Washington": "WA",
+    "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY",
+}
+
+# Collection periods in the real table at the time of writing; 1x is about
+# its size (~12.5k rows)
+BASE_PERIODS = 26
+FIRST_PERIOD = 28
+FIRST_START = np.datetime64("2021-04-14")
+
+
+def _series():
+    rows = [(group, "United States", subgroup, "US") for group, subgroups in SUBGROUPS.items()
+            for subgroup in subgroups]
+    rows += [("By State", state, state, code) for state, code in STATES.items()]
+    series = pd.DataFrame(rows, columns=["Group", "State", "Subgroup", "Code"])
+    return series.merge(pd.DataFrame({"Indicator": INDICATORS}), how="cross")
+
+
+# One label per series (or period), repeated out to every row as a categorical
+def _repeat(labels, codes):
+    categories = pd.Index(pd.unique(np.asarray(labels)))
+    return pd.Categorical.from_codes(categories.get_indexer(labels)[codes], categories=categories)
+
+
+# A table shaped like 4weekdataset.dataset, with every series in it. The
+# table grows by collection periods, so `scale` multiplies the number of
+# periods (10x and 100x run on into later years) rather than inventing new
+# groups or states. Values follow a random walk per series; `suppressed` is
+# the share of state rows with a suppressed (missing) estimate, as in the
+# real data. Columns come out in the compact dtypes of telehealth.dtypes.
+def generate(scale=1, seed=0, suppressed=0.01):
+    rng = np.random.default_rng(seed)
+    series = _series()
+    n_series, n_periods = len(series), max(int(round(BASE_PERIODS * scale)), 1)
+
+    # Rows run period by period, every series within each period
+    series_codes = np.tile(np.arange(n_series), n_periods)
+    period_codes = np.repeat(np.arange(n_periods), n_series)
+
+    starts = FIRST_START + np.arange(n_periods) * 14
+    ends = starts + 12
+    labels = [f"{start:%b %d} - {end:%b %d}" for start, end in
+              zip(starts.astype("datetime64[D]").tolist(), ends.astype("datetime64[D]").tolist())]
+    phases = [f"3.{min(period // 6 + 1, 9)}" for period in range(n_periods)]
+
+    level = rng.uniform(3, 40, n_series)
+    steps = rng.normal(0, 0.6, (n_periods, n_series))
+    value = np.clip(level + steps.cumsum(axis=0), 0.5, 95).ravel().round(1)
+    half_width = rng.uniform(0.3, 3, value.size).round(1)
+    low, high = (value - half_width).clip(0).round(1), (value + half_width).round(1)
+
+    data = pd.DataFrame({column: _repeat(series[column], series_codes)
+                         for column in ["Indicator", "Group", "State", "Subgroup"]})
+    data["Phase"] = _repeat(phases, period_codes)
+    data["Time_Period"] = (FIRST_PERIOD + period_codes).astype("int32")
+    data["Time_Period_Label"] = _repeat(labels, period_codes)
+    data["Time_Period_Start_Date"] = pd.Series(starts[period_codes]).astype("dbdate")
+    data["Time_Period_End_Date"] = pd.Series(ends[period_codes]).astype("dbdate")
+    data["Value"], data["LowCI"], data["HighCI"] = value, low, high
+
+    # Quartiles of the state estimates, labelled like the source's ranges
+    is_state = (series["Group"] == "By State").to_numpy()[series_codes]
+    edges = np.quantile(value[is_state], [0, 0.25, 0.5, 0.75, 1]).round(1)
+    ranges = [f"{edges[i]}-{edges[i + 1]}" for i in range(4)]
+    quartile = np.searchsorted(edges[1:-1], value, side="right")
+    data["Quartile_Range"] = pd.Categorical.from_codes(np.where(is_state, quartile + 1, 0), categories=[""] + ranges)
+
+    hidden = is_state & (rng.random(value.size) < suppressed)
+    data.loc[hidden, ["Value", "LowCI", "HighCI"]] = np.nan
+    data["Suppression_Flag"] = pd.Categorical.from_codes(np.where(hidden, 0, -1), categories=["1"])
+    data["Code"] = _repeat(series["Code"], series_codes)
+    return dtypes.compact(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m telehealth.synthetic",
+                                     description="Write a synthetic snapshot shaped like the BigQuery table.")
+    parser.add_argument("path", help="Snapshot file to write (.arrow or .parquet)")
+    parser.add_argument("--scale", type=float, default=1, help="Size relative to the real table, e.g. 10 or 100")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args(argv)
+
+    data = generate(args.scale, args.seed)
+    snapshot.write_snapshot(data, args.path)
+    print(f"Wrote {len(data)} rows to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import threading
+
+from telehealth.forecast import ForecastCache
+
+
+def _in_threads(target, count=4):
+    errors = []
+
+    def run():
+        try:
+            target()
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_concurrent_puts_of_one_key_each_install_a_whole_file(tmp_path):
+    cache = ForecastCache(str(tmp_path), max_bytes=2**20, max_entries=4)
+    entry = {"forecast": list(range(10000))}
+
+    errors = _in_threads(lambda: [cache.put("k", entry) for _ in range(50)])
+
+    assert not errors
+    assert os.listdir(tmp_path) == ["k.pkl"]
+    assert ForecastCache(str(tmp_path), max_bytes=2**20, max_entries=4).get("k") == entry
+
+
+def test_get_of_a_file_evicted_by_another_thread_is_a_miss(tmp_path):
+    # Room on disk for one entry, so every put evicts the others' files
+    entry = {"forecast": list(range(10000))}
+    cache = ForecastCache(str(tmp_path), max_bytes=1, max_entries=0)
+
+    def churn():
+        for n in range(50):
+            cache.put(f"k{n % 3}", entry)
+            cache.get(f"k{(n + 1) % 3}")
+
+    assert not _in_threads(churn)
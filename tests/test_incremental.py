@@ -0,0 +1,93 @@
+import pytest
+
+from telehealth import dtypes, incremental, snapshot, synthetic
+from telehealth.download import query_to_dataframe
+from telehealth.fake_bigquery import TABLE, FakeClient
+
+
+def _float64_source():
+    # BigQuery stores FLOAT64, the loaded frame keeps float32 after compact()
+    source = synthetic.generate(seed=1).astype({column: "float64" for column in dtypes.FLOAT_COLUMNS})
+    source[dtypes.FLOAT_COLUMNS] = source[dtypes.FLOAT_COLUMNS].round(1)
+    return source
+
+
+def _load(client):
+    data = dtypes.compact(query_to_dataframe(client, f"SELECT * FROM `{TABLE}`"))
+    return incremental.stamp(client, TABLE, data)
+
+
+def _refresh(source, data):
+    reloads = []
+    refreshed = incremental.refresh(FakeClient(source), TABLE, data, lambda: reloads.append(True))
+    return refreshed, reloads
+
+
+def test_refresh_of_unchanged_float64_table_skips_full_reload():
+    client = FakeClient(_float64_source())
+    data = _load(client)
+    reloads = []
+
+    refreshed = incremental.refresh(client, TABLE, data, lambda: reloads.append(True))
+
+    assert not reloads
+    assert refreshed is data
+
+
+def _swap_values(source):
+    first, second = source["Value"].dropna().index[:2]
+    source.loc[[first, second], "Value"] = source.loc[[second, first], "Value"].to_numpy()
+
+
+def _rename_subgroup(source):
+    source["Subgroup"] = source["Subgroup"].cat.rename_categories({"18 - 29 years": "18 to 29 years"})
+
+
+def _raise_high_ci(source):
+    source["HighCI"] += 1
+
+
+def _revise_value(source):
+    source.loc[source["Value"].first_valid_index(), "Value"] += 50
+
+
+@pytest.mark.parametrize("revise", [_revise_value, _swap_values, _rename_subgroup, _raise_high_ci])
+def test_refresh_after_revised_history_reloads(revise):
+    source = _float64_source()
+    data = _load(FakeClient(source))
+    revise(source)
+
+    _, reloads = _refresh(source, data)
+
+    assert reloads
+
+
+def test_refresh_without_a_stored_fingerprint_reloads():
+    source = _float64_source()
+    data = _load(FakeClient(source))
+    del data.attrs[incremental.FINGERPRINT_ATTR]
+
+    _, reloads = _refresh(source, data)
+
+    assert reloads
+
+
+def test_refresh_appends_new_periods_and_stamps_them():
+    source = _float64_source()
+    last = source["Time_Period_End_Date"].max()
+    data = _load(FakeClient(source[source["Time_Period_End_Date"] < last]))
+    client = FakeClient(source)
+
+    refreshed = incremental.refresh(client, TABLE, data, lambda: pytest.fail("full reload"))
+
+    assert len(refreshed) == len(source)
+    assert refreshed.attrs[incremental.FINGERPRINT_ATTR] == _load(client).attrs[incremental.FINGERPRINT_ATTR]
+
+
+def test_snapshots_keep_the_fingerprint(tmp_path):
+    data = _load(FakeClient(_float64_source()))
+    path = str(tmp_path / "dataset.arrow")
+
+    snapshot.write_snapshot(data, path)
+
+    assert snapshot.read_snapshot(path).attrs == data.attrs
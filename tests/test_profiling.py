@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+from telehealth import snapshot, synthetic
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Profiling patches Streamlit for the whole process, so each case runs in its own
+RACE = """
+import threading
+from telehealth import profiling
+barrier = threading.Barrier(8)
+
+def install():
+    barrier.wait()
+    profiling._install()
+
+threads = [threading.Thread(target=install) for _ in range(8)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+print(len(profiling.logger.handlers))
+"""
+
+AGE_PAGE = """
+import json
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("pages/Analysis_by_Age.py", default_timeout=120).run()
+print(json.dumps({record["function"]: record["payload_KB"] for record in at.session_state["_profile_records"]}))
+"""
+
+
+def _run(code, **env):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                            env=dict(os.environ, TELEHEALTH_PROFILE="1", **env))
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_concurrent_installs_add_one_log_handler():
+    assert _run(RACE) == "1"
+
+
+def test_charts_drawn_with_st_write_count_as_payload(tmp_path):
+    path = str(tmp_path / "dataset.arrow")
+    snapshot.write_snapshot(synthetic.generate(), path)
+
+    payload = json.loads(_run(AGE_PAGE, TELEHEALTH_DATA_SOURCE="snapshot", TELEHEALTH_SNAPSHOT_PATH=path,
+                              TELEHEALTH_PROFILE_LOG=str(tmp_path / "profile.jsonl")))
+
+    # The rose chart is drawn with st.write(fig)
+    assert payload["Analysis_by_Age.py:plot_value_by_time_period"] > 0
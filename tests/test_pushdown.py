@@ -0,0 +1,25 @@
+import pandas as pd
+
+from telehealth import synthetic
+from telehealth.download import job_config, query_to_dataframe
+from telehealth.fake_bigquery import TABLE, FakeClient
+from telehealth.pushdown import PAGE_ORDER, PushdownSlices
+
+
+def _slices(data):
+    client = FakeClient(data)
+    return PushdownSlices(TABLE, lambda query, parameters: query_to_dataframe(client, query, job_config(parameters)))
+
+
+def test_pages_sorted_by_a_column_with_ties_break_them_by_page_order():
+    data = synthetic.generate(seed=2)
+    index = _slices(data)
+    count = index.count(Group="By Age")
+
+    pages = [index.page(start, 100, "Group", False, Group="By Age") for start in range(0, count, 100)]
+    rows = pd.concat(pages, ignore_index=True)
+
+    # Group is the same on every row, so the order is PAGE_ORDER's alone
+    expected = data.loc[data["Group"] == "By Age", PAGE_ORDER].astype(str).sort_values(PAGE_ORDER, ascending=False)
+    assert len(rows) == count
+    assert rows[PAGE_ORDER].astype(str).values.tolist() == expected.values.tolist()
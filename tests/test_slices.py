@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from telehealth import dtypes, synthetic
+from telehealth.slices import SliceIndex
+
+
+@pytest.fixture
+def index():
+    return SliceIndex(dtypes.freeze(synthetic.generate(seed=3)))
+
+
+def test_sorting_a_callers_frame_in_place_leaves_the_shared_one(index):
+    before = index.data
+    by_sex = index.select(Group="By Sex")
+
+    data = index.data
+    data.sort_values("Value", inplace=True)
+
+    pd.testing.assert_frame_equal(index.data, before)
+    pd.testing.assert_frame_equal(index.select(Group="By Sex"), by_sex)
+    assert (index.select(Group="By Sex")["Group"] == "By Sex").all()
+
+
+def test_assigning_a_callers_columns_leaves_the_shared_one(index):
+    before = index.data
+
+    data = index.data
+    data["Value"] = 0.0
+    data["Group"] = "By Sex"
+
+    pd.testing.assert_frame_equal(index.data, before)
+    assert (index.select(Group="By Age")["Group"] == "By Age").all()
+
+
+def test_writing_into_the_shared_buffers_raises(index):
+    data = index.data
+    with pytest.raises(ValueError):
+        data.loc[0, "Value"] = 0.0
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+from telehealth import snapshot, synthetic
+
+
+def test_compacted_snapshot_reads_in_a_fresh_interpreter(tmp_path):
+    path = str(tmp_path / "dataset.arrow")
+    snapshot.write_snapshot(synthetic.generate(), path)
+
+    # Nothing else imported first to register the dbdate dtype
+    result = subprocess.run([sys.executable, "-c", "import sys; from telehealth.fake_bigquery import FakeClient; "
+                             "FakeClient.from_snapshot(sys.argv[1])", path],
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr